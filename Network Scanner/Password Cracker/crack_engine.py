@@ -0,0 +1,147 @@
+"""Multiprocessing engine for passwdcrack.py.
+
+The keyspace is cut into work units that are cheap to describe: a
+range of prefix indexes for brute force, a byte range of the file for
+wordlists. Each worker process expands its unit itself, hashes the
+candidates in a tight loop against a set of raw target digests and
+sends back only the hits and a count, so almost nothing crosses the
+process boundary and throughput scales with the number of cores.
+"""
+import hashlib
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+SUFFIX_LIMIT = 50_000  # precomputed suffixes per worker for brute force
+UNIT_CANDIDATES = 200_000  # rough candidates per work unit
+WORDLIST_UNIT = 4 * 1024 * 1024  # bytes of wordlist per work unit
+
+_state = {}
+
+
+def _init_worker(hash_name, targets, charset=None):
+    _state["hash_fn"] = getattr(hashlib, hash_name)
+    _state["targets"] = targets
+    _state["charset"] = charset
+    _state["suffixes"] = {}
+
+
+def suffix_length(charset_size, max_len, limit=SUFFIX_LIMIT):
+    """Most trailing positions (up to max_len) whose combinations fit in `limit`."""
+    length = 1
+    while length < max_len and charset_size ** (length + 1) <= limit:
+        length += 1
+    return length
+
+
+def index_to_candidate(index, charset, length):
+    """The index-th string of `length` in itertools.product order, as bytes."""
+    out = bytearray(length)
+    base = len(charset)
+    for pos in range(length - 1, -1, -1):
+        index, digit = divmod(index, base)
+        out[pos] = charset[digit]
+    return bytes(out)
+
+
+def brute_force_units(charset_size, min_len, max_len, unit_candidates=UNIT_CANDIDATES):
+    """Yield (length, first, last): prefix index ranges covering the keyspace."""
+    tail = suffix_length(charset_size, max_len)
+    for length in range(min_len, max_len + 1):
+        suffix_len = min(tail, length)
+        prefixes = charset_size ** (length - suffix_len)
+        step = max(1, unit_candidates // charset_size ** suffix_len)
+        for first in range(0, prefixes, step):
+            yield length, first, min(prefixes, first + step)
+
+
+def brute_force_unit(length, first, last):
+    """Hash every candidate of `length` whose prefix index is in [first, last)."""
+    hash_fn, targets, charset = _state["hash_fn"], _state["targets"], _state["charset"]
+    suffix_len = suffix_length(len(charset), length)
+    suffixes = _state["suffixes"].get(suffix_len)
+    if suffixes is None:
+        suffixes = _state["suffixes"][suffix_len] = [
+            bytes(combo) for combo in itertools.product(charset, repeat=suffix_len)
+        ]
+
+    hits = []
+    for index in range(first, last):
+        prefix = index_to_candidate(index, charset, length - suffix_len)
+        for suffix in suffixes:
+            digest = hash_fn(prefix + suffix).digest()
+            if digest in targets:
+                hits.append((digest, prefix + suffix))
+    return hits, (last - first) * len(suffixes)
+
+
+def wordlist_units(path, unit_size=WORDLIST_UNIT):
+    """Yield (path, start, end) byte ranges covering the file."""
+    size = os.path.getsize(path)
+    for start in range(0, size, unit_size):
+        yield path, start, min(size, start + unit_size)
+
+
+def wordlist_unit(path, start, end):
+    """Hash every line that starts inside [start, end) of the file."""
+    hash_fn, targets = _state["hash_fn"], _state["targets"]
+    with open(path, "rb") as f:
+        if start:
+            # a line straddling the boundary belongs to the unit it starts in
+            f.seek(start - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        if f.tell() >= end:
+            return [], 0
+        data = f.read(end - f.tell())
+        if data and not data.endswith(b"\n"):
+            data += f.readline()  # finish the last line; the next unit skips it
+
+    hits = []
+    count = 0
+    for line in data.split(b"\n"):
+        candidate = line.strip()
+        if not candidate:
+            continue
+        count += 1
+        digest = hash_fn(candidate).digest()
+        if digest in targets:
+            hits.append((digest, candidate))
+    return hits, count
+
+
+def run(unit_fn, units, hash_name, targets, processes=None, charset=None, progress=None):
+    """Run unit_fn over units on a process pool; return {digest: candidate bytes}.
+
+    At most two units per process are in flight. Stops as soon as every
+    target is found. progress(count) is called as units complete.
+    """
+    processes = processes or os.cpu_count() or 1
+    targets = frozenset(targets)
+    found = {}
+    units = iter(units)
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(hash_name, targets, charset)
+    ) as executor:
+        pending = set()
+        try:
+            while True:
+                while len(pending) < processes * 2:
+                    unit = next(units, None)
+                    if unit is None:
+                        break
+                    pending.add(executor.submit(unit_fn, *unit))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    hits, count = future.result()
+                    found.update(hits)
+                    if progress is not None:
+                        progress(count)
+                if len(found) == len(targets):
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+    return found
@@ -2,11 +2,14 @@
 import argparse
 import hashlib
 import itertools
+import os
 import string
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from tqdm import tqdm
 
+import crack_engine
+
 
 SUPPORTED_HASHES = {
     "md5": hashlib.md5,
@@ -23,10 +26,33 @@ def get_hash_fn(hash_type):
     return SUPPORTED_HASHES[hash_type]
 
 
-def check_hash(candidate, target_hash, hash_fn):
-    """Return True if candidate’s hash == target_hash."""
-    h = hash_fn(candidate.encode()).hexdigest()
-    return h == target_hash.lower()
+def parse_target(text, digest_size):
+    """Raw digest from a hex hash, or from the last field of 'user:hash'; None if invalid."""
+    field = text.strip().rsplit(":", 1)[-1].strip()
+    try:
+        digest = bytes.fromhex(field)
+    except ValueError:
+        return None
+    return digest if len(digest) == digest_size else None
+
+
+def load_targets(hashes, hash_file, digest_size):
+    """{raw digest: hash as given} from positional hashes and a hash file."""
+    lines = list(hashes)
+    if hash_file:
+        with open(hash_file, "r", encoding="utf-8", errors="ignore") as f:
+            lines.extend(line for line in f if line.strip() and not line.startswith("#"))
+    targets = {}
+    skipped = 0
+    for line in lines:
+        digest = parse_target(line, digest_size)
+        if digest is None:
+            skipped += 1
+        else:
+            targets[digest] = line.strip()
+    if skipped:
+        print(f"[!] Skipped {skipped} entries that are not {digest_size}-byte hex digests")
+    return targets
 
 
 def load_wordlist(path):
@@ -43,42 +69,92 @@ def generate_passwords(chars, min_len, max_len):
             yield "".join(combo)
 
 
-def worker(candidate, target_hash, hash_fn):
-    if check_hash(candidate, target_hash, hash_fn):
-        return candidate
-    return None
+def chunked(iterable, size):
+    """Yield lists of up to `size` items, reading the iterable lazily."""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def check_chunk(chunk, targets, hash_fn):
+    """Return (digest, candidate) for every candidate in chunk whose raw digest is in targets."""
+    hits = []
+    for candidate in chunk:
+        digest = hash_fn(candidate.encode()).digest()
+        if digest in targets:
+            hits.append((digest, candidate))
+    return hits
 
 
-def crack_with_iterable(password_iter, target_hash, hash_fn, max_workers=8, total=None, desc="Cracking"):
-    found = None
+def crack_with_iterable(password_iter, targets, hash_fn, max_workers=8, total=None, desc="Cracking",
+                        chunk_size=5000):
+    """Check candidates in chunks on a thread pool; return {digest: password}.
+
+    targets is a set of raw digests; every candidate is hashed once and
+    looked up in it. Only two chunks per worker are in flight at a time,
+    so the iterable is consumed as fast as it is checked; the rest is
+    cancelled once every target is found.
+    """
+    found = {}
+    chunks = chunked(password_iter, chunk_size)
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
+        pending = {}
         with tqdm(total=total, desc=desc, unit="pwd") as pbar:
-            for pwd in password_iter:
-                fut = executor.submit(worker, pwd, target_hash, hash_fn)
-                futures[fut] = pwd
-
-                # consume results as they complete
-                done = []
-                for f in futures:
-                    if f.done():
-                        done.append(f)
-                for f in done:
-                    futures.pop(f, None)
-                    pbar.update(1)
-                    result = f.result()
-                    if result is not None:
-                        found = result
-                        # cancel remaining
-                        for rem in futures:
-                            rem.cancel()
+            try:
+                while True:
+                    while len(pending) < max_workers * 2:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        pending[executor.submit(check_chunk, chunk, targets, hash_fn)] = len(chunk)
+                    if not pending:
                         return found
-    return found
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        pbar.update(pending.pop(fut))
+                        for digest, candidate in fut.result():
+                            found.setdefault(digest, candidate)
+                    if len(found) == len(targets):
+                        return found
+            finally:
+                # cancel remaining
+                for fut in pending:
+                    fut.cancel()
+
+
+def crack_with_processes(unit_fn, units, targets, hash_type, processes=None, charset=None,
+                         total=None, desc="Cracking"):
+    """Crack a set of raw digests on a process pool (see crack_engine); return {digest: password}."""
+    with tqdm(total=total, desc=desc, unit="pwd") as pbar:
+        found = crack_engine.run(
+            unit_fn, units, hash_type.lower(), targets,
+            processes=processes, charset=charset, progress=pbar.update,
+        )
+    return {digest: pwd.decode("utf-8", errors="replace") for digest, pwd in found.items()}
+
+
+def report(found, targets, label, single):
+    """Print newly cracked hashes; return the digests still to crack."""
+    for digest, pwd in found.items():
+        if single:
+            print(f"[+] Password found ({label}): {pwd}")
+        else:
+            print(f"[+] {targets[digest]} -> {pwd} ({label})")
+    return set(targets) - set(found)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Password hash cracker (wordlist / brute force).")
-    parser.add_argument("hash", help="Target hash to crack")
+    parser.add_argument("hash", nargs="*", help="Target hash(es) to crack")
+    parser.add_argument(
+        "-H", "--hash-file",
+        help="File of target hashes, one per line (hex, or user:hex as in dumped tables)",
+    )
+    parser.add_argument("-o", "--output", help="Append cracked hashes to this file as hash:password")
     parser.add_argument("-t", "--type", default="md5", help="Hash type (md5, sha1, sha256, sha512)")
     parser.add_argument("-w", "--wordlist", help="Path to wordlist file")
     parser.add_argument("--min-length", type=int, default=1, help="Minimum password length for brute force")
@@ -89,6 +165,24 @@ def main():
         help="Characters to use in brute-force mode (default: letters+digits)",
     )
     parser.add_argument("--threads", type=int, default=8, help="Number of threads (default: 8)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=5000,
+        help="Candidates per task for the thread engine (default: 5000)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("process", "thread"),
+        default="process",
+        help="process: split the keyspace across CPU cores (default); thread: thread pool",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count(),
+        help=f"Worker processes for the process engine (default: {os.cpu_count()})",
+    )
 
     args = parser.parse_args()
 
@@ -98,7 +192,28 @@ def main():
         print(e)
         return
 
-    target_hash = args.hash.strip()
+    if not args.hash and not args.hash_file:
+        parser.error("give a target hash or --hash-file")
+    try:
+        targets = load_targets(args.hash, args.hash_file, hash_fn().digest_size)
+    except OSError:
+        print("[-] Could not open hash file.")
+        return
+    if not targets:
+        print(f"[-] No valid {args.type} hashes to crack.")
+        return
+    single = len(targets) == 1
+    if not single:
+        print(f"[+] Loaded {len(targets)} target hashes")
+    remaining = set(targets)
+    cracked = {}
+
+    charset_bytes = None
+    if args.engine == "process":
+        try:
+            charset_bytes = args.charset.encode("ascii")
+        except UnicodeEncodeError:
+            print("[!] Non-ASCII charset; brute force falls back to the thread engine")
 
     # 1) Dictionary attack (if wordlist provided)
     if args.wordlist:
@@ -111,47 +226,80 @@ def main():
             print("[-] Could not open wordlist file.")
             return
 
-        word_iter = load_wordlist(args.wordlist)
-        found = crack_with_iterable(
-            word_iter,
-            target_hash,
-            hash_fn,
-            max_workers=args.threads,
-            total=total,
-            desc="Dictionary",
-        )
-        if found:
-            print(f"[+] Password found (dictionary): {found}")
-            return
+        if args.engine == "process":
+            found = crack_with_processes(
+                crack_engine.wordlist_unit,
+                crack_engine.wordlist_units(args.wordlist),
+                remaining,
+                args.type,
+                processes=args.processes,
+                total=total,
+                desc="Dictionary",
+            )
         else:
-            print("[-] Dictionary attack failed. Trying brute force...")
+            word_iter = load_wordlist(args.wordlist)
+            found = crack_with_iterable(
+                word_iter,
+                remaining,
+                hash_fn,
+                max_workers=args.threads,
+                total=total,
+                desc="Dictionary",
+                chunk_size=args.chunk_size,
+            )
+        cracked.update(found)
+        remaining = report(found, {d: targets[d] for d in remaining}, "dictionary", single)
+        if remaining:
+            print(f"[-] Dictionary attack left {len(remaining)} hash(es). Trying brute force...")
 
     # 2) Brute-force attack
-    print(
-        f"[+] Starting brute-force attack: "
-        f"length {args.min_length}-{args.max_length}, "
-        f"charset size={len(args.charset)}"
-    )
+    if remaining:
+        print(
+            f"[+] Starting brute-force attack: "
+            f"length {args.min_length}-{args.max_length}, "
+            f"charset size={len(args.charset)}"
+        )
 
-    # total combinations (for tqdm)
-    total = 0
-    for length in range(args.min_length, args.max_length + 1):
-        total += len(args.charset) ** length
-
-    pwd_iter = generate_passwords(args.charset, args.min_length, args.max_length)
-    found = crack_with_iterable(
-        pwd_iter,
-        target_hash,
-        hash_fn,
-        max_workers=args.threads,
-        total=total,
-        desc="Brute force",
-    )
+        # total combinations (for tqdm)
+        total = 0
+        for length in range(args.min_length, args.max_length + 1):
+            total += len(args.charset) ** length
+
+        if charset_bytes is not None:
+            found = crack_with_processes(
+                crack_engine.brute_force_unit,
+                crack_engine.brute_force_units(len(charset_bytes), args.min_length, args.max_length),
+                remaining,
+                args.type,
+                processes=args.processes,
+                charset=charset_bytes,
+                total=total,
+                desc="Brute force",
+            )
+        else:
+            pwd_iter = generate_passwords(args.charset, args.min_length, args.max_length)
+            found = crack_with_iterable(
+                pwd_iter,
+                remaining,
+                hash_fn,
+                max_workers=args.threads,
+                total=total,
+                desc="Brute force",
+                chunk_size=args.chunk_size,
+            )
+        cracked.update(found)
+        remaining = report(found, {d: targets[d] for d in remaining}, "brute force", single)
+
+    if args.output and cracked:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for digest, pwd in cracked.items():
+                print(f"{digest.hex()}:{pwd}", file=f)
 
-    if found:
-        print(f"[+] Password found (brute force): {found}")
+    if single:
+        if remaining:
+            print("[-] Password not found in given search space.")
     else:
-        print("[-] Password not found in given search space.")
+        print(f"[+] Cracked {len(cracked)}/{len(targets)} hashes")
 
 
 if __name__ == "__main__":
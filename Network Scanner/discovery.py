@@ -0,0 +1,188 @@
+"""Stateless host discovery for scanner.py, in the style of masscan.
+
+One thread transmits every probe at a paced rate without waiting for
+answers; one sniffer thread picks up replies and recognises ours by a
+cookie keyed with a per-run secret, so no per-probe state is kept and
+the probe rate does not depend on reply latency.
+"""
+import hashlib
+import ipaddress
+import os
+import random
+import threading
+import time
+
+import scapy.all as scapy
+from scapy.arch.common import compile_filter
+
+from pacing import Pacer
+
+PROBE_TYPES = ("icmp", "timestamp", "arp", "syn", "ack", "udp")
+
+# nmap's default host discovery set, plus ARP for the local segment
+DEFAULT_PROBES = ("arp", "icmp", "timestamp", "syn", "ack")
+
+DEFAULT_PORTS = {
+    "syn": (443,),
+    "ack": (80,),
+    "udp": (40125,),  # unlikely to be open, so a live host answers port-unreachable
+}
+
+
+def probe_packets(ip, probes, ports=None, cookie=None, sport=None):
+    """Yield the L3 probe packets for one host (ARP is left to the caller).
+
+    cookie(ip, port) -> 32-bit int, when given, is embedded where the
+    reply will echo it: ICMP id/seq, the TCP SYN sequence or ACK number,
+    or the IP id of UDP probes (quoted back in port-unreachable errors).
+    """
+    ports = ports or DEFAULT_PORTS
+    sport_kwargs = {"sport": sport} if sport else {}
+    for kind in ("icmp", "timestamp"):
+        if kind in probes:
+            extra = {}
+            if cookie:
+                c = cookie(ip, 0)
+                extra = {"id": c >> 16, "seq": c & 0xFFFF}
+            yield scapy.IP(dst=ip)/scapy.ICMP(type=8 if kind == "icmp" else 13, **extra)
+    if "syn" in probes:
+        for dport in ports["syn"]:
+            extra = {"seq": cookie(ip, dport)} if cookie else {}
+            yield scapy.IP(dst=ip)/scapy.TCP(dport=dport, flags="S", **sport_kwargs, **extra)
+    if "ack" in probes:
+        for dport in ports["ack"]:
+            extra = {"ack": cookie(ip, dport)} if cookie else {}
+            yield scapy.IP(dst=ip)/scapy.TCP(dport=dport, flags="A", **sport_kwargs, **extra)
+    if "udp" in probes:
+        for dport in ports["udp"]:
+            extra = {"id": cookie(ip, dport) & 0xFFFF} if cookie else {}
+            yield scapy.IP(dst=ip, **extra)/scapy.UDP(dport=dport, **sport_kwargs)
+
+
+class StatelessDiscovery:
+    """Send ICMP / ARP / TCP / UDP probes to a network and match replies by cookie."""
+
+    def __init__(self, network, probes=DEFAULT_PROBES, ports=None, rate=1000,
+                 wait=2.0, iface=None, targets=None):
+        self.network = network
+        self.targets = targets
+        self.probes = probes
+        self.ports = ports or DEFAULT_PORTS
+        self.pacer = Pacer(rate) if rate else None
+        self.wait = wait
+        self.iface = iface or scapy.conf.iface
+        self.secret = os.urandom(16)
+        self.src_port = random.randint(40000, 60000)
+        self.found = {}
+        self._lock = threading.Lock()
+
+    def cookie(self, ip, port=0):
+        """32-bit value only this run can produce for (ip, port)."""
+        data = ipaddress.ip_address(ip).packed + port.to_bytes(2, "big")
+        digest = hashlib.blake2s(data, key=self.secret, digest_size=4).digest()
+        return int.from_bytes(digest, "big")
+
+    def _targets(self):
+        for ip in self.targets if self.targets is not None else self.network.hosts():
+            ip = str(ip)
+            if "arp" in self.probes:
+                yield "l2", scapy.Ether(dst="ff:ff:ff:ff:ff:ff")/scapy.ARP(pdst=ip)
+            for pkt in probe_packets(ip, self.probes, self.ports, self.cookie, self.src_port):
+                yield "l3", pkt
+
+    def _record(self, ip, mac=None):
+        if ipaddress.ip_address(ip) not in self.network:
+            return
+        with self._lock:
+            if mac or ip not in self.found:
+                self.found[ip] = mac or self.found.get(ip, "N/A")
+
+    def _on_packet(self, pkt):
+        if pkt.haslayer(scapy.ARP):
+            arp = pkt[scapy.ARP]
+            if arp.op == 2:  # is-at; ARP has no room for a cookie, the network check must do
+                self._record(arp.psrc, arp.hwsrc)
+            return
+
+        if not pkt.haslayer(scapy.IP):
+            return
+        ip = pkt[scapy.IP].src
+        if pkt.haslayer(scapy.ICMP):
+            icmp = pkt[scapy.ICMP]
+            if icmp.type in (0, 14):  # echo / timestamp reply
+                cookie = self.cookie(ip)
+                if icmp.id == cookie >> 16 and icmp.seq == cookie & 0xFFFF:
+                    self._record(ip)
+            elif icmp.type == 3 and icmp.code == 3 and pkt.haslayer(scapy.UDPerror):
+                # port unreachable quoting our UDP probe; only trust the target itself
+                inner = pkt[scapy.IPerror]
+                udp = pkt[scapy.UDPerror]
+                if (inner.dst == ip and udp.sport == self.src_port
+                        and inner.id == self.cookie(ip, udp.dport) & 0xFFFF):
+                    self._record(ip)
+        elif pkt.haslayer(scapy.TCP):
+            tcp = pkt[scapy.TCP]
+            if tcp.dport != self.src_port:
+                return
+            # answers to a SYN acknowledge cookie + 1; the RST answering a
+            # bare ACK carries our ack number as its sequence
+            if tcp.ack == (self.cookie(ip, tcp.sport) + 1) & 0xFFFFFFFF:
+                self._record(ip)
+            elif tcp.flags.R and tcp.seq == self.cookie(ip, tcp.sport):
+                self._record(ip)
+
+    def _bpf(self):
+        parts = []
+        if "arp" in self.probes:
+            parts.append("arp")
+        if "icmp" in self.probes:
+            parts.append("icmp[0] == 0")
+        if "timestamp" in self.probes:
+            parts.append("icmp[0] == 14")
+        if "udp" in self.probes:
+            parts.append("icmp[0] == 3")
+        if "syn" in self.probes or "ack" in self.probes:
+            parts.append(f"tcp dst port {self.src_port}")
+        return " or ".join(f"({part})" for part in parts)
+
+    def _send_all(self):
+        l3 = scapy.conf.L3socket(iface=self.iface)
+        l2 = scapy.conf.L2socket(iface=self.iface) if "arp" in self.probes else None
+        try:
+            for layer, pkt in self._targets():
+                if self.pacer is not None:
+                    self.pacer.wait()
+                try:
+                    (l2 if layer == "l2" else l3).send(pkt)
+                except OSError:
+                    pass  # e.g. no route; the host simply stays undiscovered
+        finally:
+            l3.close()
+            if l2 is not None:
+                l2.close()
+
+    def run(self):
+        """Send every probe, keep listening for `wait` seconds, return {ip: mac}."""
+        bpf = self._bpf()
+        try:
+            compile_filter(bpf, iface=self.iface)
+        except (ImportError, scapy.Scapy_Exception):
+            bpf = None  # no libpcap: _on_packet checks everything itself
+
+        started = threading.Event()
+        sniffer = scapy.AsyncSniffer(
+            iface=self.iface,
+            filter=bpf,
+            prn=self._on_packet,
+            store=False,
+            started_callback=started.set,
+        )
+        sniffer.start()
+        started.wait(5)
+
+        sender = threading.Thread(target=self._send_all, daemon=True)
+        sender.start()
+        sender.join()
+        time.sleep(self.wait)  # stragglers
+        sniffer.stop()
+        return dict(self.found)
@@ -0,0 +1,122 @@
+"""SQLite inventory of discovered hosts for scanner.py.
+
+Each run updates (ip, mac, hostname, first_seen, last_seen) so the next
+one can probe known and recently changed hosts first and print only
+what changed since the previous sweep.
+"""
+import ipaddress
+import os
+import sqlite3
+import time
+
+DEFAULT_INVENTORY = os.path.join(os.path.expanduser("~"), ".scanner_inventory.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    ip          TEXT PRIMARY KEY,
+    mac         TEXT,
+    hostname    TEXT,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    last_change REAL NOT NULL,
+    live        INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+# placeholders meaning "not learned this run"; they never overwrite a stored value
+UNKNOWN = {"N/A", "Unknown", None}
+
+
+class Inventory:
+    """Host table keyed by IP; update() returns what changed."""
+
+    def __init__(self, path=DEFAULT_INVENTORY):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def _rows(self, network):
+        # string ranges are not numeric ranges, so filter by network in Python
+        for row in self.conn.execute(
+            "SELECT ip, mac, hostname, first_seen, last_seen, last_change, live FROM hosts"
+        ):
+            if ipaddress.ip_address(row[0]) in network:
+                yield row
+
+    def priority_targets(self, network, recent=86400, known_only=False):
+        """Addresses of network in probe order.
+
+        Hosts that changed within `recent` seconds come first (newest
+        change first, including ones that went away), then the other
+        previously live hosts, then, unless known_only, everything else.
+        """
+        cutoff = time.time() - recent
+        hot, warm = [], []
+        for ip, _, _, _, _, last_change, live in self._rows(network):
+            if last_change >= cutoff:
+                hot.append((last_change, ip))
+            elif live:
+                warm.append(ip)
+        hot.sort(reverse=True)
+        first = [ip for _, ip in hot] + warm
+        yield from (ipaddress.ip_address(ip) for ip in first)
+        if known_only:
+            return
+        seen = set(first)
+        for ip in network.hosts():
+            if str(ip) not in seen:
+                yield ip
+
+    def update(self, results, network, probed=None):
+        """Store (ip, mac, hostname) rows of one sweep and return the deltas.
+
+        Deltas are (change, ip, mac, hostname) with change one of "new",
+        "back", "changed" or "gone". A live host is "gone" when it was
+        probed this run (all of network unless `probed` is given) and
+        did not answer.
+        """
+        now = time.time()
+        known = {row[0]: row for row in self._rows(network)}
+        found = set()
+        deltas = []
+        for ip, mac, hostname in results:
+            found.add(ip)
+            old = known.get(ip)
+            if old is None:
+                self.conn.execute(
+                    "INSERT INTO hosts VALUES (?, ?, ?, ?, ?, ?, 1)",
+                    (ip, None if mac in UNKNOWN else mac, None if hostname in UNKNOWN else hostname,
+                     now, now, now),
+                )
+                deltas.append(("new", ip, mac, hostname))
+                continue
+
+            _, old_mac, old_hostname, _, _, last_change, live = old
+            new_mac = old_mac if mac in UNKNOWN else mac
+            new_hostname = old_hostname if hostname in UNKNOWN else hostname
+            change = None
+            if not live:
+                change = "back"
+            elif (new_mac, new_hostname) != (old_mac, old_hostname):
+                change = "changed"
+            if change:
+                last_change = now
+                deltas.append((change, ip, new_mac or "N/A", new_hostname or "Unknown"))
+            self.conn.execute(
+                "UPDATE hosts SET mac = ?, hostname = ?, last_seen = ?, last_change = ?, live = 1 WHERE ip = ?",
+                (new_mac, new_hostname, now, last_change, ip),
+            )
+
+        probed = None if probed is None else {str(ip) for ip in probed}
+        for ip, (_, mac, hostname, _, _, _, live) in known.items():
+            if live and ip not in found and (probed is None or ip in probed):
+                self.conn.execute("UPDATE hosts SET last_change = ?, live = 0 WHERE ip = ?", (now, ip))
+                deltas.append(("gone", ip, mac or "N/A", hostname or "Unknown"))
+
+        self.conn.commit()
+        deltas.sort(key=lambda d: ipaddress.ip_address(d[1]))
+        return deltas
+
+    def close(self):
+        self.conn.close()
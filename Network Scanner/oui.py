@@ -0,0 +1,142 @@
+"""Offline MAC vendor lookup for scanner.py.
+
+oui.dat holds every IEEE assignment (MA-L /24, MA-M /28 and MA-S /36
+blocks) as fixed-width records sorted by prefix, followed by a blob of
+vendor names. The file is memory-mapped and searched with a binary
+search, so a lookup touches a few pages and nothing is parsed up front.
+
+Regenerate it from a Wireshark-format manuf file (scapy ships one):
+
+    python oui.py [manuf] [-o oui.dat]
+"""
+import argparse
+import mmap
+import os
+import struct
+
+OUI_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "oui.dat")
+
+MAGIC = b"OUI1"
+HEADER = struct.Struct(">4sII")  # magic, record count, offset of the name blob
+# key: 6-byte prefix padded with zeros + prefix length, then the name offset
+RECORD = struct.Struct(">6sBI")
+KEY_SIZE = 7
+PREFIX_LENGTHS = (36, 28, 24)  # longest match first
+
+
+def mac_bytes(mac):
+    """6 raw bytes of a MAC in any of the usual notations, or None."""
+    digits = "".join(c for c in mac if c not in ":-.")
+    if len(digits) != 12:
+        return None
+    try:
+        return bytes.fromhex(digits)
+    except ValueError:
+        return None
+
+
+def mask(raw, bits):
+    value = int.from_bytes(raw, "big") >> (48 - bits) << (48 - bits)
+    return value.to_bytes(6, "big")
+
+
+class OUIIndex:
+    """Vendor names for MAC addresses, read from a memory-mapped oui.dat."""
+
+    def __init__(self, path=OUI_FILE):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._names = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an OUI index")
+
+    def _find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = HEADER.size + mid * RECORD.size
+            probe = self._map[start:start + KEY_SIZE]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                _, _, offset = RECORD.unpack_from(self._map, start)
+                end = self._map.find(b"\n", self._names + offset)
+                return self._map[self._names + offset:end].decode("utf-8")
+        return None
+
+    def vendor(self, mac):
+        """Vendor of mac, "Locally administered" for random MACs, or None."""
+        raw = mac_bytes(mac) if mac else None
+        if raw is None:
+            return None
+        for bits in PREFIX_LENGTHS:
+            name = self._find(mask(raw, bits) + bytes([bits]))
+            if name is not None:
+                return name
+        if raw[0] & 0x02:
+            return "Locally administered"
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+def parse_manuf(lines):
+    """Yield (prefix bytes, bits, vendor) from Wireshark manuf lines."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [f.strip() for f in line.split("\t") if f.strip()]
+        if len(fields) < 2:
+            continue
+        prefix, _, bits = fields[0].partition("/")
+        raw = bytes.fromhex(prefix.replace(":", "").replace("-", "")).ljust(6, b"\0")
+        bits = int(bits) if bits else 24
+        if bits not in PREFIX_LENGTHS:
+            continue
+        yield mask(raw, bits), bits, fields[-1]
+
+
+def build(entries, path=OUI_FILE):
+    """Write entries from parse_manuf() to an index file; return the record count."""
+    names = {}
+    blob = bytearray()
+    records = {}
+    for raw, bits, name in entries:
+        if name not in names:
+            names[name] = len(blob)
+            blob += name.replace("\n", " ").encode("utf-8") + b"\n"
+        records[raw + bytes([bits])] = names[name]
+
+    keys = sorted(records)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(keys), HEADER.size + len(keys) * RECORD.size))
+        for key in keys:
+            f.write(RECORD.pack(key[:6], key[6], records[key]))
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the OUI vendor index used by scanner.py.")
+    parser.add_argument("manuf", nargs="?", help="Wireshark manuf file (default: the copy bundled with scapy)")
+    parser.add_argument("-o", "--output", default=OUI_FILE, help=f"Index file to write (default: {OUI_FILE})")
+    args = parser.parse_args()
+
+    if args.manuf:
+        with open(args.manuf, "r", encoding="utf-8", errors="replace") as f:
+            count = build(parse_manuf(f), args.output)
+    else:
+        from scapy.libs.manuf import DATA
+        count = build(parse_manuf(DATA.splitlines()), args.output)
+    print(f"Wrote {count} prefixes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Token-bucket pacing for probes sent by the scanners.
+
+A Pacer combines one global bucket with optional per-host buckets.
+Callers reserve a token before each probe and sleep for the returned
+delay, so the long-run rate never exceeds the configured limit while
+short bursts up to `burst` go out immediately.
+"""
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst` tokens."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate / 10))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, n=1):
+        """Take n tokens and return how long to wait before using them.
+
+        The balance may go negative, which makes later callers queue up
+        behind this one instead of all waking at the same moment.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= n
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class Pacer:
+    """Global and per-host rate limits; a rate of None means unlimited."""
+
+    def __init__(self, rate=None, burst=None, host_rate=None, host_burst=None):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.bucket is not None or bool(self.host_rate)
+
+    def reserve(self, host=None):
+        delay = self.bucket.reserve() if self.bucket is not None else 0.0
+        if self.host_rate and host is not None:
+            with self._lock:
+                bucket = self._hosts.get(host)
+                if bucket is None:
+                    bucket = self._hosts[host] = TokenBucket(self.host_rate, self.host_burst)
+            delay = max(delay, bucket.reserve())
+        return delay
+
+    def wait(self, host=None):
+        """Block until a probe to host may be sent."""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, host=None):
+        """Asyncio counterpart of wait()."""
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def forget(self, host):
+        """Drop the bucket of a host that has been fully scanned."""
+        with self._lock:
+            self._hosts.pop(host, None)
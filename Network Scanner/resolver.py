@@ -0,0 +1,118 @@
+"""Reverse-DNS stage for scanner.py.
+
+Lookups run on their own thread pool as soon as a host is found, so a
+missing PTR record never holds up a discovery worker. Answers (including
+"no name") are cached with a TTL in a JSON file shared between runs.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".scanner_rdns_cache.json")
+
+
+def lookup(ip_addr):
+    """Blocking PTR lookup; None if the address has no name."""
+    try:
+        return socket.gethostbyaddr(ip_addr)[0]
+    except (socket.herror, socket.gaierror, OSError):
+        return None
+
+
+class ReverseResolver:
+    """Concurrent reverse lookups with a per-lookup timeout and a TTL cache."""
+
+    def __init__(self, cache_path=DEFAULT_CACHE, ttl=3600, negative_ttl=300, timeout=2.0, workers=16):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}  # ip -> [start time once a worker has it, future]
+        self._lock = threading.Lock()
+        self._cache = self._load()
+
+    def _load(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {ip: entry for ip, entry in cache.items() if entry[1] > now}
+
+    def _cached(self, ip_addr):
+        entry = self._cache.get(ip_addr)
+        if entry is not None and entry[1] > time.time():
+            return entry
+        return None
+
+    def _resolve(self, ip_addr, pending):
+        pending[0] = time.monotonic()  # the timeout runs from here, not from the queue
+        hostname = lookup(ip_addr)
+        ttl = self.ttl if hostname else self.negative_ttl
+        with self._lock:
+            self._cache[ip_addr] = [hostname, time.time() + ttl]
+            # a name whose entry expires later in the run is looked up again
+            self._pending.pop(ip_addr, None)
+        return hostname
+
+    def submit(self, ip_addr):
+        """Start resolving ip_addr in the background unless it is cached or running."""
+        with self._lock:
+            if ip_addr in self._pending or self._cached(ip_addr):
+                return
+            pending = self._pending[ip_addr] = [None, None]
+            pending[1] = self._executor.submit(self._resolve, ip_addr, pending)
+
+    def get(self, ip_addr, default="Unknown"):
+        """Hostname for ip_addr, waiting at most `timeout` once its lookup has started.
+
+        Time spent queued behind other lookups does not count.
+        """
+        with self._lock:
+            entry = self._cached(ip_addr)
+            pending = self._pending.get(ip_addr)
+        if entry is not None:
+            return entry[0] or default
+        if pending is None:
+            self.submit(ip_addr)
+            with self._lock:
+                entry = self._cached(ip_addr)
+                pending = self._pending.get(ip_addr)
+            if pending is None:  # finished already
+                return (entry[0] if entry else None) or default
+
+        future = pending[1]
+        while True:
+            started = pending[0]
+            if started is None:
+                remaining = self.timeout  # still queued; check again after this
+            else:
+                remaining = max(0.0, self.timeout - (time.monotonic() - started))
+            try:
+                return future.result(timeout=remaining) or default
+            except FutureTimeout:
+                if started is not None:
+                    return default
+
+    def close(self):
+        """Save the cache and stop waiting for lookups that are still stuck."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if not self.cache_path:
+            return
+        with self._lock:
+            cache = dict(self._cache)
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[!] Could not save DNS cache: {e}")
@@ -1,65 +1,344 @@
 import scapy.all as scapy
+import argparse
 import ipaddress
-import socket
 import threading
 from queue import Queue
 
-def scan(ip, result_queue):
+from discovery import DEFAULT_PROBES, PROBE_TYPES, StatelessDiscovery, probe_packets
+from inventory import DEFAULT_INVENTORY, Inventory
+from oui import OUI_FILE, OUIIndex
+from pacing import Pacer
+from resolver import DEFAULT_CACHE, ReverseResolver
+
+def arp_lookup(ip_addr, timeout=1):
+    """MAC address of ip_addr from an ARP who-has, or None."""
+    try:
+        reply = scapy.srp1(
+            scapy.Ether(dst="ff:ff:ff:ff:ff:ff")/scapy.ARP(pdst=ip_addr),
+            timeout=timeout, verbose=False,
+        )
+    except Exception:
+        return None
+    return reply[scapy.ARP].hwsrc if reply is not None else None
+
+def scan(ip, result_queue, pacer=None, resolver=None, probes=DEFAULT_PROBES, ports=None, timeout=1):
+    ip_addr = str(ip)
     try:
-        # Use Layer 3 socket instead of Layer 2 for Windows compatibility
-        # Send ICMP ping to check if host is alive
-        ans = scapy.sr1(scapy.IP(dst=str(ip))/scapy.ICMP(), timeout=1, verbose=False)
-        if ans:
-            ip_addr = str(ip)
+        packets = list(probe_packets(ip_addr, probes, ports))
+        if pacer is not None:
+            for _ in range(len(packets) + ("arp" in probes)):
+                pacer.wait(ip_addr)
+
+        # ARP runs alongside the L3 probes, so it also yields the MAC of a live host
+        arp_result = []
+        arp_thread = None
+        if "arp" in probes:
+            arp_thread = threading.Thread(
+                target=lambda: arp_result.append(arp_lookup(ip_addr, timeout)), daemon=True
+            )
+            arp_thread.start()
+
+        # Send the whole probe set at once; the first reply from the host ends the wait
+        heard = []
+
+        def from_host(pkt):
+            if pkt.haslayer(scapy.IP) and pkt[scapy.IP].src == ip_addr:
+                heard.append(pkt)
+                return True
+            return False
+
+        if packets:
+            scapy.sr(packets, timeout=timeout, verbose=False, stop_filter=from_host)
+
+        mac_addr = None
+        if arp_thread is not None:
+            arp_thread.join()
+            mac_addr = arp_result[0] if arp_result else None
+        if not heard and mac_addr is None:
+            return
+
+        if mac_addr is None and arp_thread is None:
             # Try to get MAC address using ARP (may not work without winpcap)
-            mac_addr = "N/A"
-            try:
-                arp_result = scapy.sr1(scapy.ARP(pdst=str(ip)), timeout=1, verbose=False)
-                if arp_result:
-                    mac_addr = arp_result.hwsrc
-            except:
-                pass
-            
-            # Get hostname
-            try:
-                hostname = socket.gethostbyaddr(ip_addr)[0]
-            except (socket.herror, socket.gaierror):
-                hostname = "Unknown"
-            result_queue.put((ip_addr, mac_addr, hostname))
+            if pacer is not None:
+                pacer.wait(ip_addr)
+            mac_addr = arp_lookup(ip_addr)
+
+        # the name is looked up on the resolver's own threads
+        if resolver is not None:
+            resolver.submit(ip_addr)
+        result_queue.put((ip_addr, mac_addr or "N/A"))
     except Exception as e:
         # Silently skip hosts that cause errors
         pass
+    finally:
+        if pacer is not None:
+            pacer.forget(ip_addr)
+
+def batch_scan(network, timeout=2, inter=0, probes=DEFAULT_PROBES, ports=None, resolver=None, targets=None):
+    """Sweep the whole network with one ARP and one L3 send/receive pass.
 
-def print_results(results):
+    scapy matches replies to requests, so the total wait is about one
+    timeout window instead of one per host. ARP only reaches the local
+    segment; the L3 probes also find routed hosts, whose MAC is then
+    unknown. targets, when given, replaces network.hosts().
+    """
+    targets = list(network.hosts()) if targets is None else list(targets)
+    found = {}
+    if "arp" in probes and targets:
+        try:
+            ans, _ = scapy.srp(
+                scapy.Ether(dst="ff:ff:ff:ff:ff:ff")/scapy.ARP(pdst=[str(ip) for ip in targets]),
+                timeout=timeout, inter=inter, verbose=False,
+            )
+            for _, reply in ans:
+                found[reply.psrc] = reply.hwsrc
+        except Exception as e:
+            print(f"[!] ARP sweep failed: {e}")
+
+    packets = [
+        pkt for ip in targets for pkt in probe_packets(str(ip), probes, ports)
+    ]
+    if packets:
+        try:
+            ans, _ = scapy.sr(packets, timeout=timeout, inter=inter, verbose=False)
+            for sent, reply in ans:
+                # an error from a router on the way does not make the target live
+                if reply.haslayer(scapy.IP) and reply[scapy.IP].src == sent[scapy.IP].dst:
+                    found.setdefault(reply[scapy.IP].src, "N/A")
+        except Exception as e:
+            # keep whatever the ARP sweep found
+            print(f"[!] Probe sweep failed: {e}")
+
+    return build_results(found, network, resolver)
+
+def build_results(found, network, resolver=None):
+    """Turn {ip: mac} into sorted (ip, mac, hostname) rows for network.hosts() addresses."""
+    excluded = set()
+    if network.num_addresses > 2:
+        excluded = {network.network_address, network.broadcast_address}
+    hosts = [
+        ip for ip in found
+        if ipaddress.ip_address(ip) in network and ipaddress.ip_address(ip) not in excluded
+    ]
+    hosts.sort(key=ipaddress.ip_address)
+    if resolver is None:
+        return [(ip, found[ip], "Unknown") for ip in hosts]
+    for ip in hosts:
+        resolver.submit(ip)
+    return [(ip, found[ip], resolver.get(ip)) for ip in hosts]
+
+def worker(address_queue, result_queue, pacer=None, resolver=None, probes=DEFAULT_PROBES, ports=None):
+    """Scan addresses from the queue until a None sentinel arrives."""
+    while True:
+        ip = address_queue.get()
+        if ip is None:
+            break
+        scan(ip, result_queue, pacer, resolver, probes, ports)
+
+def vendor_of(oui, mac):
+    return (oui.vendor(mac) if oui is not None else None) or ""
+
+def print_results(results, oui=None):
     # Print header
-    print("{:<16}  {:<18}  {:<}".format("IP Address", "MAC Address", "Hostname"))
-    print("-" * 50)
+    print("{:<16}  {:<18}  {:<30}  {:<}".format("IP Address", "MAC Address", "Hostname", "Vendor"))
+    print("-" * 80)
     for ip, mac, host in results:
-        print("{:<16}  {:<18}  {:<}".format(ip, mac, host))
+        print("{:<16}  {:<18}  {:<30}  {:<}".format(ip, mac, host, vendor_of(oui, mac)))
 
-def main():
-    cidr = input("Enter network (CIDR notation, e.g., 192.168.1.0/24): ")
+def print_changes(deltas, oui=None):
+    if not deltas:
+        print("No changes since the last sweep.")
+        return
+    print("{:<8}  {:<16}  {:<18}  {:<30}  {:<}".format("Change", "IP Address", "MAC Address", "Hostname", "Vendor"))
+    print("-" * 90)
+    for change, ip, mac, host in deltas:
+        print("{:<8}  {:<16}  {:<18}  {:<30}  {:<}".format(change, ip, mac, host, vendor_of(oui, mac)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ICMP/ARP network scanner.")
+    parser.add_argument("cidr", nargs="?", help="Network in CIDR notation (prompted if omitted)")
+    parser.add_argument("-w", "--workers", type=int, default=64, help="Number of scanning threads (default: 64)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--batch",
+        action="store_true",
+        help="Send the whole ARP and ICMP sweep in one pass instead of probing host by host",
+    )
+    mode.add_argument(
+        "--stateless",
+        action="store_true",
+        help="One paced sender thread and one sniffer matching replies by cookie (masscan style)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=2,
+        help="Reply wait for --batch sweeps, or after the last --stateless probe (default: 2)",
+    )
+    parser.add_argument(
+        "--probes",
+        default=",".join(DEFAULT_PROBES),
+        help=f"Probe types sent to every host, from {','.join(PROBE_TYPES)} "
+             f"(default: {','.join(DEFAULT_PROBES)}); a host is up once any of them is answered",
+    )
+    parser.add_argument("--syn-ports", default="443", help="TCP ports for syn probes (default: 443)")
+    parser.add_argument("--ack-ports", default="80", help="TCP ports for ack probes (default: 80)")
+    parser.add_argument("--udp-ports", default="40125", help="UDP ports for udp probes (default: 40125)")
+    parser.add_argument("--no-resolve", dest="resolve", action="store_false", help="Skip reverse DNS lookups")
+    parser.add_argument(
+        "--dns-cache",
+        default=DEFAULT_CACHE,
+        help=f"Reverse DNS cache file, '' to disable (default: {DEFAULT_CACHE})",
+    )
+    parser.add_argument("--dns-ttl", type=int, default=3600, help="Seconds to trust cached names (default: 3600)")
+    parser.add_argument("--dns-timeout", type=float, default=2.0, help="Per-lookup timeout (default: 2)")
+    parser.add_argument("--dns-workers", type=int, default=16, help="Concurrent reverse lookups (default: 16)")
+    parser.add_argument("--no-vendor", dest="vendor", action="store_false", help="Skip MAC vendor lookups")
+    parser.add_argument("--oui-file", default=OUI_FILE, help="MAC vendor index built by oui.py (default: bundled)")
+    parser.add_argument(
+        "--inventory",
+        nargs="?",
+        const=DEFAULT_INVENTORY,
+        help=f"Record results in this SQLite inventory (default file: {DEFAULT_INVENTORY})",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Probe known and recently changed hosts first and print only changes (implies --inventory)",
+    )
+    parser.add_argument(
+        "--known-only",
+        action="store_true",
+        help="With --diff, probe only hosts already in the inventory",
+    )
+    parser.add_argument(
+        "--recent",
+        type=float,
+        default=24,
+        help="Hours within which a host counts as recently changed (default: 24)",
+    )
+    parser.add_argument("--iface", help="Interface for --stateless (default: scapy's default route)")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Maximum probes per second (default: unlimited, 1000 for --stateless)",
+    )
+    parser.add_argument("--burst", type=int, help="Probes allowed at once before --rate applies")
+    parser.add_argument("--host-rate", type=float, help="Maximum probes per second to any single host")
+    return parser.parse_args()
+
+def parse_ports(text):
+    return tuple(int(p) for p in text.split(",") if p.strip())
+
+def discover(args, network, resolver=None, targets=None):
+    """Run the discovery mode selected in args and return result rows.
+
+    targets is an optional iterable of addresses, in probe order, to use
+    instead of every address of network.
+    """
+    probes = tuple(p.strip() for p in args.probes.split(",") if p.strip())
+    unknown = set(probes) - set(PROBE_TYPES)
+    if unknown:
+        print(f"Unknown probe types: {', '.join(sorted(unknown))}")
+        return []
     try:
-        network = ipaddress.ip_network(cidr, strict=False)
+        ports = {
+            "syn": parse_ports(args.syn_ports),
+            "ack": parse_ports(args.ack_ports),
+            "udp": parse_ports(args.udp_ports),
+        }
     except ValueError:
-        print("Invalid CIDR notation.")
-        return
+        print("Probe ports must be comma separated integers.")
+        return []
 
+    if args.stateless:
+        engine = StatelessDiscovery(
+            network,
+            probes=probes,
+            ports=ports,
+            rate=args.rate or 1000,
+            wait=args.timeout,
+            iface=args.iface,
+            targets=targets,
+        )
+        return build_results(engine.run(), network, resolver)
+
+    if args.batch:
+        # one pass: pace it with scapy's inter-packet gap instead of the token bucket
+        inter = 1 / args.rate if args.rate else 0
+        return batch_scan(network, args.timeout, inter, probes, ports, resolver, targets)
+
+    pacer = None
+    if args.rate or args.host_rate:
+        pacer = Pacer(args.rate, args.burst, args.host_rate)
+
+    # a small bounded queue keeps memory flat however large the network is
     result_queue = Queue()
+    address_queue = Queue(maxsize=args.workers * 4)
     threads = []
-    for ip in network.hosts():
-        t = threading.Thread(target=scan, args=(ip, result_queue))
+    for _ in range(args.workers):
+        t = threading.Thread(target=worker, args=(address_queue, result_queue, pacer, resolver, probes, ports), daemon=True)
         t.start()
         threads.append(t)
 
+    for ip in targets if targets is not None else network.hosts():
+        address_queue.put(ip)
+    for _ in threads:
+        address_queue.put(None)
+
     for t in threads:
         t.join()
 
-    results = []
+    found = {}
     while not result_queue.empty():
-        results.append(result_queue.get())
-    
-    print_results(results)
+        ip_addr, mac_addr = result_queue.get()
+        found[ip_addr] = mac_addr
+    return build_results(found, network, resolver)
+
+def main():
+    args = parse_args()
+    cidr = args.cidr or input("Enter network (CIDR notation, e.g., 192.168.1.0/24): ")
+    try:
+        network = ipaddress.ip_network(cidr, strict=False)
+    except ValueError:
+        print("Invalid CIDR notation.")
+        return
+
+    inventory_path = args.inventory or (DEFAULT_INVENTORY if args.diff else None)
+    inventory = Inventory(inventory_path) if inventory_path else None
+
+    oui = None
+    if args.vendor:
+        try:
+            oui = OUIIndex(args.oui_file)
+        except (OSError, ValueError) as e:
+            print(f"[!] MAC vendor lookup disabled: {e}")
+
+    resolver = None
+    if args.resolve:
+        resolver = ReverseResolver(args.dns_cache, args.dns_ttl, timeout=args.dns_timeout, workers=args.dns_workers)
+    try:
+        targets = probed = None
+        if args.diff:
+            targets = inventory.priority_targets(network, args.recent * 3600, args.known_only)
+            if args.known_only:
+                targets = probed = list(targets)
+        results = discover(args, network, resolver, targets)
+        if inventory is None:
+            print_results(results, oui)
+            return
+        deltas = inventory.update(results, network, probed)
+        if args.diff:
+            print_changes(deltas, oui)
+        else:
+            print_results(results, oui)
+    finally:
+        if resolver is not None:
+            resolver.close()
+        if inventory is not None:
+            inventory.close()
+        if oui is not None:
+            oui.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
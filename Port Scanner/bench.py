@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Offline benchmark for the port.py scan engines.
+
+Starts local listeners on 127.0.0.0/8 (Linux routes the whole block to
+loopback) and scans them with each engine in a fresh process:
+
+  open    accepts and sends an SSH banner straight away
+  slow    accepts and sends an SMTP banner after --slow-delay seconds
+  silent  listen backlog kept full, so SYNs are dropped like a firewall would
+  closed  nothing listening, the kernel answers with RST
+
+Reports ports/sec, p50/p99 discovery latency, peak RSS and accuracy, and
+can compare against a saved baseline to flag regressions. A run that
+misses an open port fails the benchmark; many hosts with one port each
+and a tiny window exercise the probe scheduler's host rotation:
+
+  bench.py --hosts 254 --ports 1 --open 1 --silent 0 --slow 0 \
+      --threads 1 --window 1 --max-hosts 1 --no-banner
+"""
+import argparse
+import heapq
+import json
+import multiprocessing
+import queue as queue_module
+import random
+import resource
+import selectors
+import signal
+import socket
+import sys
+import threading
+import time
+
+import port
+
+OPEN_BANNER = b"SSH-2.0-OpenSSH_bench\r\n"
+SLOW_BANNER = b"220 bench.local ESMTP ready\r\n"
+EXPECTED_SERVICE = {"open": "SSH", "slow": "SMTP"}
+
+
+def build_layout(args):
+    """Pick the listener kind for every non-closed (host, port), reproducibly."""
+    rng = random.Random(args.seed)
+    hosts = [f"127.77.{i // 250}.{i % 250 + 1}" for i in range(args.hosts)]
+    ports = range(args.base_port, args.base_port + args.ports)
+    kinds = ["open"] * args.open + ["silent"] * args.silent + ["slow"] * args.slow
+    if len(kinds) > len(ports):
+        raise SystemExit("More listeners per host than ports in the range")
+
+    listeners = []
+    for host in hosts:
+        for p, kind in zip(rng.sample(ports, len(kinds)), kinds):
+            listeners.append((host, p, kind))
+    return {"hosts": hosts, "start": ports.start, "end": ports.stop - 1, "listeners": listeners}
+
+
+class Listeners:
+    """Serve every listener of a layout from one selector thread."""
+
+    def __init__(self, layout, slow_delay):
+        self.layout = layout
+        self.slow_delay = slow_delay
+        self._selector = selectors.DefaultSelector()
+        self._sockets = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        for host, p, kind in self.layout["listeners"]:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, p))
+            self._sockets.append(sock)
+            if kind == "silent":
+                # never accept and fill the queue; further SYNs get dropped
+                sock.listen(0)
+                for _ in range(2):
+                    filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    filler.setblocking(False)
+                    filler.connect_ex((host, p))
+                    self._sockets.append(filler)
+            else:
+                sock.listen(128)
+                sock.setblocking(False)
+                self._selector.register(sock, selectors.EVENT_READ, kind)
+        time.sleep(0.2)  # let the fillers complete their handshakes
+        self._thread.start()
+
+    def _serve(self):
+        delayed = []
+        counter = 0
+        while not self._stop.is_set():
+            timeout = 0.1
+            if delayed:
+                timeout = max(0.0, min(timeout, delayed[0][0] - time.monotonic()))
+            for key, _ in self._selector.select(timeout):
+                try:
+                    conn, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                if key.data == "open":
+                    self._send_and_close(conn, OPEN_BANNER)
+                else:
+                    counter += 1
+                    heapq.heappush(delayed, (time.monotonic() + self.slow_delay, counter, conn))
+
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                self._send_and_close(heapq.heappop(delayed)[2], SLOW_BANNER)
+
+    @staticmethod
+    def _send_and_close(conn, banner):
+        try:
+            conn.sendall(banner)
+        except OSError:
+            pass
+        conn.close()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_engine(config, layout, queue):
+    """Child process: scan the layout with one engine and report its stats."""
+    latencies = []
+
+    def timed(fn):
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                latencies.append(time.monotonic() - started)
+        return wrapper
+
+    def timed_async(fn):
+        async def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                latencies.append(time.monotonic() - started)
+        return wrapper
+
+    # the engines look these up at call time, so wrapping them here is enough
+    port.discover_port = timed(port.discover_port)
+    port.async_discover_port = timed_async(port.async_discover_port)
+
+    ports = range(layout["start"], layout["end"] + 1)
+    scheduler = port.ProbeScheduler(layout["hosts"], ports, config["per_host"], config["max_hosts"])
+    timing = port.TimingEngine(retries=config["retries"])
+    found = []
+
+    started = time.monotonic()
+    if config["engine"] == "async":
+        concurrency = port.raise_fd_limit(config["concurrency"])
+        port.asyncio.run(port.async_scan(
+            scheduler, found.append, concurrency, timing, config["banner_workers"], config["grab_banners"]
+        ))
+    else:
+        found.extend(port.iter_thread_scan(
+            scheduler, config["threads"], config["window"], timing, config["banner_workers"], config["grab_banners"]
+        ))
+    elapsed = time.monotonic() - started
+
+    expected = {(host, p): kind for host, p, kind in layout["listeners"] if kind != "silent"}
+    reported = {(entry["host"], entry["port"]): entry for entry in found}
+    hits = expected.keys() & reported.keys()
+    services_ok = sum(
+        1 for key in hits if reported[key]["service"] == EXPECTED_SERVICE[expected[key]]
+    )
+    service_accuracy = None
+    if config["grab_banners"]:
+        service_accuracy = services_ok / len(hits) if hits else 1.0
+    probes = len(layout["hosts"]) * len(ports)
+
+    queue.put({
+        "name": config["name"],
+        "probes": probes,
+        "elapsed": elapsed,
+        "ports_per_sec": probes / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "recall": len(hits) / len(expected) if expected else 1.0,
+        "false_positives": len(reported.keys() - expected.keys()),
+        "service_accuracy": service_accuracy,
+    })
+
+
+def engine_configs(args):
+    configs = []
+    for engine in args.engines.split(","):
+        # same defaults as port.py: only the thread engine caps probes per host
+        per_host = args.per_host
+        if per_host is None and engine == "thread":
+            per_host = port.THREAD_PER_HOST
+        for grab in ([True, False] if args.both_stages else [not args.no_banner]):
+            name = engine + ("" if grab else "/no-banner")
+            configs.append({
+                "name": name,
+                "engine": engine,
+                "threads": args.threads,
+                "window": args.window,
+                "concurrency": args.concurrency,
+                "per_host": per_host,
+                "max_hosts": args.max_hosts,
+                "retries": args.retries,
+                "banner_workers": args.banner_workers,
+                "grab_banners": grab,
+            })
+    return configs
+
+
+def print_report(results):
+    print(f"\n{'Engine':<18} {'Ports/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8} "
+          f"{'Recall':>7} {'FP':>5} {'Service':>8}")
+    print("-" * 80)
+    for r in results:
+        service = "-" if r["service_accuracy"] is None else f"{r['service_accuracy']:.1%}"
+        print(f"{r['name']:<18} {r['ports_per_sec']:>10.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['peak_rss_mb']:>8.1f} {r['recall']:>7.1%} {r['false_positives']:>5} "
+              f"{service:>8}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Print changes against a baseline; return False if anything regressed."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for r in results:
+        base = baseline.get(r["name"])
+        if base is None:
+            continue
+        checks = [
+            ("ports/sec", r["ports_per_sec"] < base["ports_per_sec"] * (1 - tolerance)),
+            ("p99 latency", r["p99_ms"] > base["p99_ms"] * (1 + tolerance)),
+            ("peak RSS", r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance)),
+            ("recall", r["recall"] < base["recall"]),
+            ("false positives", r["false_positives"] > base["false_positives"]),
+            # None when banners were off in either run
+            ("service accuracy", r["service_accuracy"] is not None
+             and base.get("service_accuracy") is not None
+             and r["service_accuracy"] < base["service_accuracy"]),
+        ]
+        regressed = [what for what, bad in checks if bad]
+        change = (r["ports_per_sec"] / base["ports_per_sec"] - 1) if base["ports_per_sec"] else 0.0
+        status = "REGRESSED: " + ", ".join(regressed) if regressed else "ok"
+        print(f"  {r['name']:<18} ports/s {change:+.1%}  {status}")
+        ok = ok and not regressed
+    return ok
+
+
+def collect(proc, queue, timeout):
+    """The result run_engine put on queue, or None if the child died or ran out of time."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # checked before the get: a child that already exited has flushed its result
+        alive = proc.is_alive()
+        try:
+            return queue.get(timeout=1)
+        except queue_module.Empty:
+            if not alive:
+                return None
+    proc.terminate()
+    return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark port.py engines against local listeners.")
+    parser.add_argument("--hosts", type=int, default=4, help="Loopback addresses to spread listeners over")
+    parser.add_argument("--ports", type=int, default=2000, help="Ports scanned per host")
+    parser.add_argument("--base-port", type=int, default=40000, help="First port of the scanned range")
+    parser.add_argument("--open", type=int, default=20, help="Open listeners per host")
+    parser.add_argument("--silent", type=int, default=5, help="Filtered-looking listeners per host")
+    parser.add_argument("--slow", type=int, default=5, help="Slow-banner listeners per host")
+    parser.add_argument("--slow-delay", type=float, default=0.3, help="Delay before a slow banner")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the listener layout")
+    parser.add_argument("--engines", default="thread,async", help="Comma separated engines to run")
+    parser.add_argument("--threads", type=int, default=100, help="Threads for the thread engine")
+    parser.add_argument("--window", type=int, help="Outstanding probes for the thread engine (default: 4 per thread)")
+    parser.add_argument("--concurrency", type=int, default=2000, help="In-flight probes for the async engine")
+    parser.add_argument("--per-host", type=int, help="In-flight probes per host (default: as in port.py)")
+    parser.add_argument("--max-hosts", type=int, default=64, help="Hosts scanned in parallel")
+    parser.add_argument("--retries", type=int, default=1, help="Retries for unanswered probes")
+    parser.add_argument("--banner-workers", type=int, default=50, help="Concurrent banner grabs")
+    parser.add_argument("--no-banner", action="store_true", help="Benchmark discovery only")
+    parser.add_argument("--both-stages", action="store_true", help="Run each engine with and without banners")
+    parser.add_argument("--json", help="Write results to this file (usable as a later --compare baseline)")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --json run")
+    parser.add_argument("--run-timeout", type=float, default=600, help="Seconds allowed per engine run (default: 600)")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown vs baseline (default: 0.10)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    layout = build_layout(args)
+    port.raise_fd_limit(len(layout["listeners"]) * 3 + args.concurrency + 256)
+
+    listeners = Listeners(layout, args.slow_delay)
+    try:
+        listeners.start()
+    except OSError as e:
+        print(f"Could not start listeners (127.0.0.0/8 must be routed to loopback): {e}")
+        return 1
+
+    print(f"Listeners: {len(layout['hosts'])} hosts x {args.ports} ports, "
+          f"{args.open} open / {args.slow} slow / {args.silent} silent per host")
+
+    results = []
+    failed = []
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for config in engine_configs(args):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=run_engine, args=(config, layout, queue))
+            proc.start()
+            result = collect(proc, queue, args.run_timeout)
+            proc.join()
+            if result is None:
+                if proc.exitcode == -signal.SIGTERM:
+                    reason = f"timed out after {args.run_timeout:g}s"
+                else:
+                    reason = f"exit code {proc.exitcode}" if proc.exitcode else "no result"
+                print(f"  {config['name']}: FAILED ({reason})")
+                failed.append(config["name"])
+                continue
+            results.append(result)
+            print(f"  {config['name']}: {result['elapsed']:.2f}s")
+            if result["recall"] < 1.0:
+                # a scan that stops early or skips hosts is a bug, not a slowdown
+                failed.append(f"{config['name']} (recall {result['recall']:.1%})")
+    finally:
+        listeners.stop()
+
+    if results:
+        print_report(results)
+    if failed:
+        print(f"\nFailed runs: {', '.join(failed)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Checkpoint files for resumable port.py scans.
+
+Progress is kept as one bit per port of the scanned range for each host
+still in progress; hosts whose ports are all done collapse to a plain
+entry in `finished`. Partial bitmaps are zlib-compressed on disk, so
+even a full 1-65535 sweep of a large subnet stays small.
+"""
+import base64
+import json
+import os
+import time
+import zlib
+
+STATE_VERSION = 1
+
+
+class Checkpoint:
+    """Finished (host, port) probes plus the open ports found so far."""
+
+    def __init__(self, path, specs, start_port, end_port, interval=10.0):
+        self.path = path
+        self.specs = list(specs)
+        self.start_port = start_port
+        self.end_port = end_port
+        self.interval = interval
+        self.finished = set()
+        self.results = []
+        self._bitmaps = {}
+        self._counts = {}
+        self._last_save = time.monotonic()
+
+    @property
+    def nports(self):
+        return self.end_port - self.start_port + 1
+
+    def host_done(self, host):
+        return host in self.finished
+
+    def is_done(self, host, port):
+        if host in self.finished:
+            return True
+        bitmap = self._bitmaps.get(host)
+        if bitmap is None:
+            return False
+        i = port - self.start_port
+        return bool(bitmap[i >> 3] & (1 << (i & 7)))
+
+    def mark(self, host, port):
+        if host in self.finished:
+            return
+        bitmap = self._bitmaps.get(host)
+        if bitmap is None:
+            bitmap = self._bitmaps[host] = bytearray((self.nports + 7) // 8)
+            self._counts[host] = 0
+
+        i = port - self.start_port
+        bit = 1 << (i & 7)
+        if bitmap[i >> 3] & bit:
+            return
+        bitmap[i >> 3] |= bit
+        self._counts[host] += 1
+        if self._counts[host] == self.nports:
+            self.finished.add(host)
+            del self._bitmaps[host], self._counts[host]
+
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def add_result(self, entry):
+        self.results.append(entry)
+        self.mark(entry["host"], entry["port"])
+
+    def save(self):
+        """Write the state atomically, so an interrupt never leaves a torn file."""
+        state = {
+            "version": STATE_VERSION,
+            "specs": self.specs,
+            "start_port": self.start_port,
+            "end_port": self.end_port,
+            "finished": sorted(self.finished),
+            "partial": {
+                host: base64.b64encode(zlib.compress(bytes(bitmap))).decode()
+                for host, bitmap in self._bitmaps.items()
+            },
+            "results": self.results,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def load(cls, path, interval=10.0):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+
+        checkpoint = cls(path, state["specs"], state["start_port"], state["end_port"], interval)
+        checkpoint.finished = set(state["finished"])
+        checkpoint.results = state["results"]
+        for host, data in state["partial"].items():
+            bitmap = bytearray(zlib.decompress(base64.b64decode(data)))
+            checkpoint._bitmaps[host] = bitmap
+            checkpoint._counts[host] = sum(bin(byte).count("1") for byte in bitmap)
+        return checkpoint
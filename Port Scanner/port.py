@@ -1,61 +1,520 @@
+import argparse
+import asyncio
+import contextlib
+import errno
+import ipaddress
 import socket
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-# Map some common ports to services for display
-COMMON_SERVICES = {
-    20: "FTP-Data",
-    21: "FTP",
-    22: "SSH",
-    23: "Telnet",
-    25: "SMTP",
-    53: "DNS",
-    80: "HTTP",
-    110: "POP3",
-    143: "IMAP",
-    443: "HTTPS",
-    3306: "MySQL",
-    3389: "RDP",
-}
-
-
-def get_banner(sock, timeout=1.0, max_bytes=1024):
-    """Try to grab a banner from an open socket."""
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from checkpoint import Checkpoint
+from pacing import Pacer
+from scan_output import WRITERS, open_writer
+from service_probes import guess_service, match_service, probes_for
+
+# connect_ex results that mean "no answer yet" rather than a definite reply
+AMBIGUOUS_ERRNOS = {errno.EAGAIN, errno.EWOULDBLOCK, errno.ETIMEDOUT, errno.EINPROGRESS}
+THREAD_PER_HOST = 256  # default --per-host for the thread engine
+
+
+class HostTiming:
+    """Round-trip estimate for one host, following RFC 6298 (SRTT/RTTVAR)."""
+
+    def __init__(self, initial_timeout):
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial_timeout
+
+    def update(self, rtt, min_timeout, max_timeout):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(max_timeout, max(min_timeout, self.srtt + 4 * self.rttvar))
+
+
+class TimingEngine:
+    """Per-host connect/banner timeouts derived from measured round trips.
+
+    Every definite reply (an accepted or refused connect) is an RTT sample
+    for its host. Until a host has answered, the initial timeout is used.
+    With adaptive=False the initial timeout is used throughout.
+    """
+
+    def __init__(self, initial_timeout=1.0, min_timeout=0.1, max_timeout=3.0,
+                 retries=1, adaptive=True, banner_timeout=1.0):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.retries = retries
+        self.adaptive = adaptive
+        self.fixed_banner_timeout = banner_timeout
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def connect_timeout(self, host):
+        if not self.adaptive:
+            return self.initial_timeout
+        with self._lock:
+            timing = self._hosts.get(host)
+            return timing.rto if timing else self.initial_timeout
+
+    def banner_timeout(self, host):
+        if not self.adaptive:
+            return self.fixed_banner_timeout
+        with self._lock:
+            timing = self._hosts.get(host)
+            if timing is None:
+                return self.fixed_banner_timeout
+            # the service needs at least a round trip plus some think time
+            return min(self.max_timeout, max(0.25, 2 * timing.rto))
+
+    def record(self, host, rtt):
+        if not self.adaptive:
+            return
+        with self._lock:
+            timing = self._hosts.get(host)
+            if timing is None:
+                timing = self._hosts[host] = HostTiming(self.initial_timeout)
+            timing.update(rtt, self.min_timeout, self.max_timeout)
+
+    def forget(self, host):
+        """Drop state for a host that has been fully scanned."""
+        with self._lock:
+            self._hosts.pop(host, None)
+
+
+def identify_service(sock, port, timeout=1.0, max_bytes=1024):
+    """Probe an open socket until a reply matches a known service.
+
+    Returns (service, banner). Stops at the first recognised reply, or at
+    any unrecognised one, since further probes rarely help then.
+    """
     sock.settimeout(timeout)
-    try:
-        # Send a simple probe (works for many TCP services like HTTP)
+    for probe in probes_for(port):
         try:
-            sock.sendall(b"HEAD / HTTP/1.0\r\n\r\n")
+            if probe.payload:
+                sock.sendall(probe.payload)
+            data = sock.recv(max_bytes)
+        except socket.timeout:
+            continue  # nothing said yet, try the next probe
         except OSError:
-            pass  # some services close on send, just try recv
-
-        data = sock.recv(max_bytes)
+            break
         if not data:
-            return ""
-        return data.decode(errors="ignore").strip()
-    except (socket.timeout, OSError):
-        return ""
+            break  # peer closed
+
+        banner = data.decode(errors="ignore").strip()
+        return match_service(data) or guess_service(port), banner
+    return guess_service(port), ""
+
+
+def make_result(host, port, service, banner=""):
+    return {
+        "host": host,
+        "port": port,
+        "service": service,
+        "banner": banner,
+    }
+
+
+def discover_port(host, port, timeout=0.5, timing=None, pacer=None):
+    """Return True if a TCP connect to host:port succeeds.
+
+    With a TimingEngine the timeout follows the host's measured RTT and
+    probes that get no answer are retried; refused ports are not. With a
+    Pacer every connect attempt, retries included, waits for a token.
+    """
+    attempts = 1 if timing is None else timing.retries + 1
+    for _ in range(attempts):
+        if timing is not None:
+            timeout = timing.connect_timeout(host)
+        if pacer is not None:
+            pacer.wait(host)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            started = time.monotonic()
+            result = sock.connect_ex((host, port))
+            if result in AMBIGUOUS_ERRNOS:
+                continue  # no answer, maybe lost: try again
+
+            if timing is not None and result in (0, errno.ECONNREFUSED):
+                timing.record(host, time.monotonic() - started)
+            return result == 0
+        except socket.timeout:
+            continue
+        except OSError:
+            return False
+        finally:
+            sock.close()
+    return False  # filtered
 
 
-def scan_port(host, port, timeout=0.5):
-    """Scan a single TCP port; return dict if open, else None."""
+def grab_service(host, port, timeout=1.0):
+    """Reconnect to an open port and identify the service behind it."""
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.settimeout(timeout)
     try:
-        result = sock.connect_ex((host, port))
-        if result != 0:
-            return None  # closed or filtered
-
-        banner = get_banner(sock)
-        service = COMMON_SERVICES.get(port, "Unknown")
-        return {
-            "port": port,
-            "service": service,
-            "banner": banner,
-        }
+        sock.connect((host, port))
+        service, banner = identify_service(sock, port, timeout)
     except OSError:
-        return None
+        service, banner = guess_service(port), ""
     finally:
         sock.close()
+    return make_result(host, port, service, banner)
+
+
+async def async_identify_service(reader, writer, port, timeout=1.0, max_bytes=1024):
+    """Asyncio counterpart of identify_service for an open stream pair."""
+    for probe in probes_for(port):
+        try:
+            if probe.payload:
+                writer.write(probe.payload)
+                await writer.drain()
+            data = await asyncio.wait_for(reader.read(max_bytes), timeout)
+        except asyncio.TimeoutError:
+            continue  # nothing said yet, try the next probe
+        except OSError:
+            break
+        if not data:
+            break  # peer closed
+
+        banner = data.decode(errors="ignore").strip()
+        return match_service(data) or guess_service(port), banner
+    return guess_service(port), ""
+
+
+async def async_discover_port(host, port, timeout=0.5, timing=None, pacer=None):
+    """Asyncio counterpart of discover_port, using a bare non-blocking socket."""
+    loop = asyncio.get_running_loop()
+    attempts = 1 if timing is None else timing.retries + 1
+    for _ in range(attempts):
+        if timing is not None:
+            timeout = timing.connect_timeout(host)
+        if pacer is not None:
+            await pacer.wait_async(host)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (host, port)), timeout)
+        except asyncio.TimeoutError:
+            continue  # no answer, maybe lost: try again
+        except ConnectionRefusedError:
+            if timing is not None:
+                timing.record(host, time.monotonic() - started)
+            return False  # closed
+        except OSError:
+            return False  # unreachable
+        finally:
+            sock.close()
+
+        if timing is not None:
+            timing.record(host, time.monotonic() - started)
+        return True
+    return False  # filtered
+
+
+async def async_grab_service(host, port, timeout=1.0):
+    """Asyncio counterpart of grab_service."""
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout
+        )
+    except (asyncio.TimeoutError, OSError):
+        return make_result(host, port, guess_service(port))
+
+    try:
+        service, banner = await async_identify_service(reader, writer, port, timeout)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+    return make_result(host, port, service, banner)
+
+
+def raise_fd_limit(wanted):
+    """Raise the open-file soft limit towards wanted; return the usable count."""
+    if resource is None:
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < wanted:
+        new_soft = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+            soft = new_soft
+        except (ValueError, OSError):
+            pass
+    # keep some descriptors free for stdio, DNS, etc.
+    return max(1, min(wanted, soft - 32))
+
+
+class ProbeScheduler:
+    """Hand out (host, port) probes round-robin across a window of hosts.
+
+    At most `max_hosts` hosts are active at once, so large CIDR ranges are
+    expanded lazily, and each host is limited to `per_host` outstanding
+    probes (None for no limit). Callers must `release(host, port, is_open)`
+    once a probe handed out by `next_probe()` has finished.
+
+    With a Checkpoint, probes it already records as done are skipped and
+    closed or filtered ports are recorded on release; open ports are
+    recorded by whoever reports them, once their service is known. A
+    probe released with finished=False (cancelled or failed) is not
+    recorded, so a resumed scan tries it again.
+    """
+
+    def __init__(self, hosts, ports, per_host=None, max_hosts=64, checkpoint=None):
+        self._hosts = iter(hosts)
+        self._ports = ports
+        self.per_host = per_host
+        self.max_hosts = max_hosts
+        self.checkpoint = checkpoint
+        self._active = deque()
+        self._in_flight = {}
+        self._hosts_done = False
+
+    def _refill(self):
+        while not self._hosts_done and len(self._active) < self.max_hosts:
+            try:
+                host = next(self._hosts)
+            except StopIteration:
+                self._hosts_done = True
+                break
+
+            if self.checkpoint is None:
+                port_iter = iter(self._ports)
+            elif self.checkpoint.host_done(host):
+                continue
+            else:
+                port_iter = (p for p in self._ports if not self.checkpoint.is_done(host, p))
+            self._active.append((host, port_iter))
+            self._in_flight.setdefault(host, 0)
+
+    @property
+    def exhausted(self):
+        """True once every probe has been handed out."""
+        self._refill()
+        return not self._active
+
+    def next_probe(self):
+        """Return the next (host, port), or None if none can be issued now.
+
+        None means every active host is at its per_host limit, or every
+        probe has been handed out.
+        """
+        self._refill()
+        capped = 0  # hosts at their limit since the window last changed
+        while capped < len(self._active):
+            host, port_iter = self._active[0]
+            if self.per_host is not None and self._in_flight[host] >= self.per_host:
+                self._active.rotate(-1)
+                capped += 1
+                continue
+
+            port = next(port_iter, None)
+            if port is None:
+                self._active.popleft()
+                if self._in_flight[host] == 0:
+                    del self._in_flight[host]
+                # refilled hosts join at the back, so start the rotation over
+                self._refill()
+                capped = 0
+                continue
+
+            self._active.rotate(-1)
+            self._in_flight[host] += 1
+            return host, port
+        return None
+
+    def release(self, host, port, is_open, finished=True):
+        """Mark one probe as finished; return True if its host is done."""
+        if self.checkpoint is not None and finished and not is_open:
+            self.checkpoint.mark(host, port)
+        self._in_flight[host] -= 1
+        if self._in_flight[host] == 0 and all(h != host for h, _ in self._active):
+            del self._in_flight[host]
+            return True
+        return False
+
+
+def forget_host(host, timing, pacer):
+    """Drop per-host timing and pacing state once a host is fully scanned."""
+    if timing is not None:
+        timing.forget(host)
+    if pacer is not None:
+        pacer.forget(host)
+
+
+async def async_scan(scheduler, on_result, concurrency=2000, timing=None,
+                     banner_concurrency=50, grab_banners=True, pacer=None):
+    """Scan probes from the scheduler, keeping at most `concurrency` in flight.
+
+    Open ports are handed to a separate banner stage limited to
+    `banner_concurrency` connections, so slow services never hold up
+    discovery. on_result is called with each open-port dict once its
+    service is known (immediately if grab_banners is False).
+    """
+    wakeup = asyncio.Event()
+    banner_slots = asyncio.Semaphore(banner_concurrency)
+    banner_tasks = set()
+    in_flight = 0
+
+    async def banner_stage(host, port, timeout):
+        async with banner_slots:
+            return await async_grab_service(host, port, timeout)
+
+    def on_banner(task):
+        banner_tasks.discard(task)
+        if not task.cancelled() and task.exception() is None:
+            on_result(task.result())
+
+    def on_discovered(task, host, port):
+        nonlocal in_flight
+        # a probe cancelled by an interrupted scan has no answer to record
+        finished = not task.cancelled() and task.exception() is None
+        is_open = finished and task.result()
+        if is_open and grab_banners:
+            timeout = 1.0 if timing is None else timing.banner_timeout(host)
+            banner_task = asyncio.ensure_future(banner_stage(host, port, timeout))
+            banner_tasks.add(banner_task)
+            banner_task.add_done_callback(on_banner)
+
+        in_flight -= 1
+        if scheduler.release(host, port, is_open, finished):
+            forget_host(host, timing, pacer)
+        wakeup.set()
+        if is_open and not grab_banners:
+            on_result(make_result(host, port, guess_service(port)))
+
+    while True:
+        probe = scheduler.next_probe() if in_flight < concurrency else None
+        if probe is None:
+            if in_flight == 0 and scheduler.exhausted:
+                break
+            wakeup.clear()
+            await wakeup.wait()
+            continue
+
+        host, port = probe
+        in_flight += 1
+        task = asyncio.ensure_future(async_discover_port(host, port, timing=timing, pacer=pacer))
+        task.add_done_callback(lambda t, h=host, p=port: on_discovered(t, h, p))
+
+    if banner_tasks:
+        await asyncio.wait(set(banner_tasks))
+
+
+def iter_thread_scan(scheduler, max_workers=100, window=None, timing=None,
+                     banner_workers=50, grab_banners=True, pacer=None):
+    """Yield open-port dicts from a thread pool as they complete.
+
+    Probes are pulled from the scheduler lazily so that no more than
+    `window` discovery futures (default 4 per thread) exist at any time.
+    Open ports are passed to a second pool of `banner_workers` threads
+    for service detection, unless grab_banners is False.
+    """
+    window = window or max_workers * 4
+    pending = {}
+    grabbing = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            ThreadPoolExecutor(max_workers=banner_workers) as banner_executor:
+        try:
+            while True:
+                while len(pending) < window:
+                    probe = scheduler.next_probe()
+                    if probe is None:
+                        break
+                    host, port = probe
+                    pending[executor.submit(discover_port, host, port, timing=timing, pacer=pacer)] = probe
+
+                if not pending and not grabbing:
+                    if scheduler.exhausted:
+                        break
+                    continue  # next_probe had nothing yet; the window can refill
+
+                done, _ = wait(pending.keys() | grabbing, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in grabbing:
+                        grabbing.discard(future)
+                        yield future.result()
+                        continue
+
+                    host, port = pending.pop(future)
+                    is_open = future.result()
+                    if is_open and grab_banners:
+                        timeout = 1.0 if timing is None else timing.banner_timeout(host)
+                        grabbing.add(banner_executor.submit(grab_service, host, port, timeout))
+
+                    if scheduler.release(host, port, is_open):
+                        forget_host(host, timing, pacer)
+                    if is_open and not grab_banners:
+                        yield make_result(host, port, guess_service(port))
+        finally:
+            for future in pending.keys() | grabbing:
+                future.cancel()
+
+
+def iter_targets(specs):
+    """Yield IPv4 addresses for each IP, hostname or CIDR range in specs."""
+    seen = set()
+    for spec in specs:
+        for entry in spec.replace(",", " ").split():
+            if "/" in entry:
+                try:
+                    network = ipaddress.IPv4Network(entry, strict=False)
+                except ValueError:
+                    print(f"Invalid network: {entry}")
+                    continue
+                addresses = (str(ip) for ip in network.hosts())
+            else:
+                try:
+                    addresses = [socket.gethostbyname(entry)]
+                except socket.gaierror:
+                    print(f"Could not resolve host: {entry}")
+                    continue
+
+            for addr in addresses:
+                if addr not in seen:
+                    seen.add(addr)
+                    yield addr
+
+
+def load_target_file(path):
+    """Read target specs from a file, one or more per line; '#' starts a comment."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
+
+
+def print_open_port(entry):
+    """Print a single open port as soon as it is found."""
+    print(f"[+] {entry['host']}:{entry['port']} open ({entry['service']})")
+
+
+def print_all_results(results):
+    """Print one table per host that had open ports."""
+    by_host = {}
+    for entry in results:
+        by_host.setdefault(entry["host"], []).append(entry)
+
+    if not by_host:
+        print("\nNo open ports found on any target.")
+        return
+
+    for host in sorted(by_host, key=ipaddress.ip_address):
+        print_results(by_host[host], host)
 
 
 def print_results(results, host):
@@ -76,48 +535,258 @@ def print_results(results, host):
         print(f"{port:<8} {service:<15} {banner}")
 
 
-def main():
-    target = input("Enter target IP or hostname: ").strip()
-    try:
-        host = socket.gethostbyname(target)
-    except socket.gaierror:
-        print("Could not resolve host.")
-        return
-
-    try:
-        start_port = int(input("Enter start port: ").strip())
-        end_port = int(input("Enter end port (inclusive): ").strip())
-    except ValueError:
-        print("Ports must be integers.")
-        return
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simple TCP connect port scanner.")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Target IPs, hostnames or CIDR ranges, space or comma separated (prompted if omitted)",
+    )
+    parser.add_argument("-iL", "--target-file", help="File with targets, one or more per line")
+    parser.add_argument("-s", "--start", type=int, help="Start port")
+    parser.add_argument("-e", "--end", type=int, help="End port (inclusive)")
+    parser.add_argument("-t", "--threads", type=int, help="Number of threads for the thread engine")
+    parser.add_argument(
+        "--engine",
+        choices=("thread", "async"),
+        default="thread",
+        help="Scan engine: blocking sockets in a thread pool, or asyncio (default: thread)",
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=2000,
+        help="Maximum in-flight probes for the async engine, all on one host if need be (default: 2000)",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        help="Maximum outstanding probes for the thread engine (default: 4 per thread)",
+    )
+    parser.add_argument(
+        "--banner-workers",
+        type=int,
+        default=50,
+        help="Concurrent banner grabs, separate from discovery (default: 50)",
+    )
+    parser.add_argument(
+        "--no-banner",
+        dest="grab_banners",
+        action="store_false",
+        help="Only discover open ports; skip banner grabbing and service detection",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Stream results to this file as they are found ('-' for stdout)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        help="Output format (default: from the file extension, else jsonl)",
+    )
+    parser.add_argument(
+        "--no-table",
+        dest="table",
+        action="store_false",
+        help="Do not keep results for the summary table at the end",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Save progress to this state file so an interrupted scan can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        help="Continue the scan recorded in this state file, skipping finished probes",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Maximum connect attempts per second across all hosts (default: unlimited)",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        help="Attempts allowed at once before --rate applies (default: rate/10)",
+    )
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        help="Maximum connect attempts per second against any single host",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Fixed connect timeout in seconds; disables adaptive timing",
+    )
+    parser.add_argument(
+        "--min-timeout",
+        type=float,
+        default=0.1,
+        help="Lower bound for adaptive connect timeouts (default: 0.1)",
+    )
+    parser.add_argument(
+        "--max-timeout",
+        type=float,
+        default=3.0,
+        help="Upper bound for adaptive connect timeouts (default: 3.0)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=1,
+        help="Retries for probes that get no answer at all (default: 1)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        help=(
+            "Maximum in-flight probes against a single host "
+            f"(default: {THREAD_PER_HOST} for the thread engine, only --concurrency for async)"
+        ),
+    )
+    parser.add_argument(
+        "--max-hosts",
+        type=int,
+        default=64,
+        help="Number of hosts scanned in parallel (default: 64)",
+    )
+    return parser.parse_args()
 
-    if start_port < 1 or end_port > 65535 or start_port > end_port:
-        print("Invalid port range.")
-        return
 
-    try:
-        max_workers = int(input("Enter number of threads (e.g. 100): ").strip())
-    except ValueError:
-        max_workers = 100
+def run_scan(args, specs, ports, timing, report, checkpoint=None, pacer=None):
+    """Run the engine selected in args, passing each open port to report.
 
-    print(f"\nScanning {host} from port {start_port} to {end_port} using {max_workers} threads...\n")
+    Returns False if the scan was interrupted.
+    """
+    targets = ", ".join(specs)
+    start_port, end_port = ports[0], ports[-1]
 
-    open_results = []
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(scan_port, host, port): port
-            for port in range(start_port, end_port + 1)
-        }
+    if args.engine == "async":
+        concurrency = raise_fd_limit(args.concurrency)
+        scheduler = ProbeScheduler(iter_targets(specs), ports, args.per_host, args.max_hosts, checkpoint)
+        print(f"\nScanning {targets} from port {start_port} to {end_port} with up to {concurrency} async probes...\n")
+        try:
+            asyncio.run(async_scan(
+                scheduler, report, concurrency, timing, args.banner_workers, args.grab_banners, pacer
+            ))
+        except KeyboardInterrupt:
+            print("\nScan interrupted by user.")
+            return False
+    else:
+        max_workers = args.threads
+        if max_workers is None:
+            try:
+                max_workers = int(input("Enter number of threads (e.g. 100): ").strip())
+            except ValueError:
+                max_workers = 100
 
+        per_host = THREAD_PER_HOST if args.per_host is None else args.per_host
+        scheduler = ProbeScheduler(iter_targets(specs), ports, per_host, args.max_hosts, checkpoint)
+        print(f"\nScanning {targets} from port {start_port} to {end_port} using {max_workers} threads...\n")
         try:
-            for future in as_completed(futures):
-                res = future.result()
-                if res:
-                    open_results.append(res)
+            for entry in iter_thread_scan(
+                scheduler, max_workers, args.window, timing, args.banner_workers, args.grab_banners, pacer
+            ):
+                report(entry)
         except KeyboardInterrupt:
             print("\nScan interrupted by user.")
+            return False
+    return True
+
+
+def main():
+    args = parse_args()
+
+    checkpoint = None
+    if args.resume:
+        try:
+            checkpoint = Checkpoint.load(args.resume)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load checkpoint: {e}")
+            return
+        specs = checkpoint.specs
+        start_port, end_port = checkpoint.start_port, checkpoint.end_port
+    else:
+        specs = list(args.targets)
+        if args.target_file:
+            try:
+                specs.extend(load_target_file(args.target_file))
+            except OSError as e:
+                print(f"Could not read target file: {e}")
+                return
+        if not specs:
+            specs = [input("Enter targets (IP, hostname or CIDR; comma separated): ").strip()]
+
+        try:
+            start_port = args.start if args.start is not None else int(input("Enter start port: ").strip())
+            end_port = args.end if args.end is not None else int(input("Enter end port (inclusive): ").strip())
+        except ValueError:
+            print("Ports must be integers.")
+            return
+
+        if start_port < 1 or end_port > 65535 or start_port > end_port:
+            print("Invalid port range.")
+            return
+
+        if args.checkpoint:
+            checkpoint = Checkpoint(args.checkpoint, specs, start_port, end_port)
+
+    ports = range(start_port, end_port + 1)
+    if args.timeout is not None:
+        timing = TimingEngine(args.timeout, retries=args.retries, adaptive=False)
+    else:
+        timing = TimingEngine(
+            min_timeout=args.min_timeout,
+            max_timeout=args.max_timeout,
+            retries=args.retries,
+        )
+
+    pacer = None
+    if args.rate or args.host_rate:
+        pacer = Pacer(args.rate, args.burst, args.host_rate)
+
+    writer = None
+    if args.output:
+        try:
+            writer = open_writer(args.output, args.format, " ".join(sys.argv))
+        except OSError as e:
+            print(f"Could not open output file: {e}")
+            return
+
+    # with results on stdout, everything human-readable goes to stderr
+    to_stdout = args.output == "-"
+    keep_table = args.table and not to_stdout
+    open_results = []
+
+    def report(entry, record=True):
+        if checkpoint is not None and record:
+            checkpoint.add_result(entry)
+        if writer is not None:
+            writer.write(entry)
+        if keep_table:
+            open_results.append(entry)
+        print_open_port(entry)
+
+    try:
+        with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+            if args.resume:
+                print(f"Resuming scan from {args.resume} ({len(checkpoint.results)} open ports found earlier)")
+                for entry in checkpoint.results:
+                    report(entry, record=False)
+
+            completed = run_scan(args, specs, ports, timing, report, checkpoint, pacer)
+            if checkpoint is not None:
+                if completed:
+                    checkpoint.remove()
+                else:
+                    checkpoint.save()
+                    print(f"Progress saved; continue with --resume {checkpoint.path}")
+    finally:
+        if writer is not None:
+            writer.close()
 
-    print_results(open_results, host)
+    if keep_table:
+        print_all_results(open_results)
 
 
 if __name__ == "__main__":
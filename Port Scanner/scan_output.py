@@ -0,0 +1,146 @@
+"""Streaming result writers for port.py (JSON Lines, CSV and nmap-style XML).
+
+Each writer formats a result as soon as it arrives and flushes to the
+underlying stream in batches, so consumers can tail the file while a
+scan is running without paying for a flush per line.
+"""
+import csv
+import json
+import os
+import re
+import sys
+import time
+from xml.sax.saxutils import quoteattr
+
+FIELDS = ("host", "port", "service", "banner")
+
+# characters that are not allowed anywhere in an XML 1.0 document
+_XML_INVALID = re.compile("[^\x09\x0a\x0d\x20-\ud7ff\ue000-\ufffd]")
+
+
+class ResultWriter:
+    """Base writer: subclasses implement write_entry() and optionally header/footer."""
+
+    def __init__(self, stream, flush_every=100, flush_interval=1.0):
+        self.stream = stream
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    def write_entry(self, entry):
+        raise NotImplementedError
+
+    def write(self, entry):
+        self.write_entry(entry)
+        self.count += 1
+        self._unflushed += 1
+        now = time.monotonic()
+        if self._unflushed >= self.flush_every or now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.stream.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.write_footer()
+        self.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class JSONLinesWriter(ResultWriter):
+    def write_entry(self, entry):
+        self.stream.write(json.dumps(entry) + "\n")
+
+
+class CSVWriter(ResultWriter):
+    def write_header(self):
+        self._csv = csv.writer(self.stream, lineterminator="\n")
+        self._csv.writerow(FIELDS)
+
+    def write_entry(self, entry):
+        self._csv.writerow([entry[field] for field in FIELDS])
+
+
+class NmapXMLWriter(ResultWriter):
+    """Write results in the layout of `nmap -oX`.
+
+    Results are not grouped, so every open port gets its own <host>
+    element; nmap XML consumers merge these by address.
+    """
+
+    def __init__(self, stream, command="", **kwargs):
+        self.command = command
+        self.started = time.time()
+        self.hosts = set()
+        super().__init__(stream, **kwargs)
+
+    def write_header(self):
+        self.stream.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            "<!DOCTYPE nmaprun>\n"
+            f'<nmaprun scanner="port.py" args={quoteattr(self.command)} '
+            f'start="{int(self.started)}" startstr={quoteattr(time.ctime(self.started))} '
+            'version="1.0" xmloutputversion="1.05">\n'
+            '<scaninfo type="connect" protocol="tcp"/>\n'
+        )
+
+    def write_entry(self, entry):
+        self.hosts.add(entry["host"])
+        banner = _XML_INVALID.sub("", entry["banner"])
+        method = "probed" if banner else "table"
+        script = f'<script id="banner" output={quoteattr(banner)}/>' if banner else ""
+        self.stream.write(
+            '<host><status state="up" reason="syn-ack"/>'
+            f'<address addr={quoteattr(entry["host"])} addrtype="ipv4"/>'
+            f'<ports><port protocol="tcp" portid="{entry["port"]}">'
+            '<state state="open" reason="syn-ack"/>'
+            f'<service name={quoteattr(entry["service"].lower())} method="{method}"/>'
+            f"{script}</port></ports></host>\n"
+        )
+
+    def write_footer(self):
+        finished = time.time()
+        self.stream.write(
+            f'<runstats><finished time="{int(finished)}" timestr={quoteattr(time.ctime(finished))} '
+            f'elapsed="{finished - self.started:.2f}" exit="success"/>'
+            f'<hosts up="{len(self.hosts)}" down="0" total="{len(self.hosts)}"/></runstats>\n'
+            "</nmaprun>\n"
+        )
+
+
+WRITERS = {
+    "jsonl": JSONLinesWriter,
+    "csv": CSVWriter,
+    "xml": NmapXMLWriter,
+}
+
+
+def guess_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("json", "jsonl", "ndjson"):
+        return "jsonl"
+    return ext if ext in WRITERS else "jsonl"
+
+
+def open_writer(path, fmt=None, command="", **kwargs):
+    """Open a writer for path ("-" for stdout), picking the format from the extension if needed."""
+    fmt = fmt or guess_format(path)
+    if path == "-":
+        stream = sys.stdout
+    else:
+        stream = open(path, "w", encoding="utf-8", newline="")
+    if fmt == "xml":
+        kwargs["command"] = command
+    return WRITERS[fmt](stream, **kwargs)
@@ -0,0 +1,99 @@
+"""Probe and signature database used by port.py for service detection.
+
+Each open port is first given a chance to speak on its own (the null
+probe), then sent the probes registered for its port number. The first
+reply that matches a signature decides the service.
+"""
+import re
+from collections import namedtuple
+
+# payload is sent as-is; client_first means the service never speaks
+# before the client does, so waiting on the null probe is pointless
+Probe = namedtuple("Probe", "name payload ports client_first")
+
+HTTP_PORTS = {80, 81, 443, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8443, 8888, 9000, 9090}
+
+NULL_PROBE = Probe("NULL", b"", None, False)
+
+# used when no port-specific probe exists and the null probe got nothing
+FALLBACK_PROBE = Probe("GetRequest", b"HEAD / HTTP/1.0\r\n\r\n", None, True)
+
+PROBES = [
+    Probe("GetRequest", b"HEAD / HTTP/1.0\r\n\r\n", HTTP_PORTS, True),
+    Probe("RedisPing", b"PING\r\n", {6379}, True),
+    Probe("MemcachedVersion", b"version\r\n", {11211}, True),
+    Probe(
+        "RDPConnectionRequest",
+        b"\x03\x00\x00\x13\x0e\xe0\x00\x00\x00\x00\x00\x01\x00\x08\x00\x03\x00\x00\x00",
+        {3389},
+        True,
+    ),
+    Probe(
+        "DNSVersionBindTCP",
+        b"\x00\x1e\x00\x06\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00"
+        b"\x07version\x04bind\x00\x00\x10\x00\x03",
+        {53},
+        True,
+    ),
+]
+
+# (service, pattern) pairs, tried in order against the raw reply
+SIGNATURES = [
+    (name, re.compile(pattern, re.S))
+    for name, pattern in [
+        ("SSH", rb"^SSH-\d\.\d+-"),
+        ("HTTP", rb"^HTTP/\d\.\d \d{3}"),
+        ("FTP", rb"^220[ -][^\r\n]*(?i:ftp)"),
+        ("SMTP", rb"^220[ -][^\r\n]*(?i:smtp|mail|postfix|exim|sendmail)"),
+        ("POP3", rb"^\+OK"),
+        ("IMAP", rb"^\* (?:OK|PREAUTH)"),
+        ("MySQL", rb"^.\x00\x00\x00\x0a\d+\.\d+"),
+        ("MySQL", rb"^.\x00\x00\x00\xff..Host .* is not allowed to connect"),
+        ("VNC", rb"^RFB \d{3}\.\d{3}"),
+        ("Telnet", rb"^\xff[\xfb-\xfe]"),
+        ("Redis", rb"^(?:\+PONG|-NOAUTH|-DENIED)"),
+        ("Memcached", rb"^VERSION \d"),
+        ("RDP", rb"^\x03\x00\x00.\x0e\xd0"),
+        ("DNS", rb"^\x00.\x00\x06[\x80-\x87]"),
+        ("SSL/TLS", rb"^\x15\x03[\x00-\x04]\x00\x02"),
+        ("AMQP", rb"^AMQP"),
+    ]
+]
+
+# Port-based guess, used only when no signature matches the reply
+PORT_HINTS = {
+    20: "FTP-Data",
+    21: "FTP",
+    22: "SSH",
+    23: "Telnet",
+    25: "SMTP",
+    53: "DNS",
+    80: "HTTP",
+    110: "POP3",
+    143: "IMAP",
+    443: "HTTPS",
+    3306: "MySQL",
+    3389: "RDP",
+}
+
+
+def probes_for(port):
+    """Return the probes to try against port, in order."""
+    specific = [probe for probe in PROBES if port in probe.ports]
+    if not specific:
+        return [NULL_PROBE, FALLBACK_PROBE]
+    if all(probe.client_first for probe in specific):
+        return specific
+    return [NULL_PROBE] + specific
+
+
+def match_service(data):
+    """Return the service whose signature matches data, or None."""
+    for name, pattern in SIGNATURES:
+        if pattern.match(data):
+            return name
+    return None
+
+
+def guess_service(port):
+    return PORT_HINTS.get(port, "Unknown")
@@ -0,0 +1,283 @@
+"""Asyncio stub resolver for subdomain_enumeration.py.
+
+Queries go out over a handful of UDP sockets and are matched to their
+replies by (socket, query id, question), so thousands of lookups can be
+in flight at once. A lookup that times out or gets SERVFAIL/REFUSED is
+retried against the next nameserver. CachingResolver adds a shared
+positive/negative answer cache on top.
+"""
+import asyncio
+import ipaddress
+import random
+import socket
+import struct
+import time
+from collections import OrderedDict, namedtuple
+
+QTYPES = {"A": 1, "CNAME": 5, "AAAA": 28}
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+RETRY_STATUSES = {"SERVFAIL", "REFUSED", "TIMEOUT"}
+FALLBACK_NAMESERVERS = ("1.1.1.1", "8.8.8.8")
+
+HEADER = struct.Struct(">HHHHHH")
+RR = struct.Struct(">HHIH")
+
+# status is an RCODES value or "TIMEOUT"; ttl is the smallest TTL in the answer
+Answer = namedtuple("Answer", "name status addresses cnames ttl")
+
+
+def system_nameservers(path="/etc/resolv.conf"):
+    """Nameservers from resolv.conf, or public fallbacks."""
+    servers = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    servers.append(fields[1])
+    except OSError:
+        pass
+    return servers or list(FALLBACK_NAMESERVERS)
+
+
+def parse_nameserver(text):
+    """'1.1.1.1', 'ns1.example:5353', '::1' or '[::1]:53' -> (address, port).
+
+    Host names are resolved here, once; ValueError if that fails.
+    """
+    text = text.strip()
+    if text.startswith("["):
+        host, _, port = text[1:].partition("]")
+        port = port.lstrip(":") or "53"
+    elif text.count(":") == 1:
+        host, port = text.split(":")
+    else:
+        host, port = text, "53"
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"bad nameserver port in {text!r}")
+    try:
+        info = socket.getaddrinfo(host, int(port), type=socket.SOCK_DGRAM)
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"cannot resolve nameserver {host!r}") from None
+    return info[0][4][0], int(port)
+
+
+def build_query(qid, name, qtype=1):
+    labels = b"".join(
+        bytes([len(label)]) + label for label in name.rstrip(".").encode("idna").split(b".")
+    )
+    return HEADER.pack(qid, 0x0100, 1, 0, 0, 0) + labels + b"\0" + struct.pack(">HH", qtype, 1)
+
+
+def read_name(data, offset):
+    """Decode a possibly compressed name; return (name, offset after it)."""
+    labels = []
+    end = None
+    for _ in range(128):  # bounds pointer loops in hostile packets
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length == 0:
+            return ".".join(labels), (end if end is not None else offset + 1)
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+        offset += 1 + length
+    raise ValueError("name compression loop")
+
+
+def parse_response(data):
+    """Return (qid, question name, rcode, addresses, cnames, min ttl)."""
+    qid, flags, qdcount, ancount, _, _ = HEADER.unpack_from(data)
+    offset = HEADER.size
+    question = ""
+    for _ in range(qdcount):
+        question, offset = read_name(data, offset)
+        offset += 4
+    addresses, cnames, ttls = [], [], []
+    for _ in range(ancount):
+        _, offset = read_name(data, offset)
+        rtype, _, ttl, rdlength = RR.unpack_from(data, offset)
+        offset += RR.size
+        rdata = data[offset:offset + rdlength]
+        if rtype == 1 and rdlength == 4:
+            addresses.append(socket.inet_ntop(socket.AF_INET, rdata))
+        elif rtype == 28 and rdlength == 16:
+            addresses.append(socket.inet_ntop(socket.AF_INET6, rdata))
+        elif rtype == 5:
+            cnames.append(read_name(data, offset)[0])
+        ttls.append(ttl)
+        offset += rdlength
+    return qid, question, flags & 0x0F, addresses, cnames, min(ttls) if ttls else 0
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, resolver, index):
+        self.resolver = resolver
+        self.index = index
+
+    def datagram_received(self, data, addr):
+        self.resolver._on_reply(self.index, data, addr)
+
+    def error_received(self, exc):
+        pass  # e.g. ICMP port unreachable; the query just times out
+
+
+class AsyncResolver:
+    """Resolve names concurrently over a small pool of UDP sockets."""
+
+    def __init__(self, nameservers=None, sockets=4, timeout=2.0, retries=2):
+        # strings are parsed here; (address, port) pairs are taken as they are
+        self.nameservers = [
+            parse_nameserver(ns) if isinstance(ns, str) else tuple(ns)
+            for ns in (nameservers or system_nameservers())
+        ]
+        self.socket_count = sockets
+        self.timeout = timeout
+        self.retries = retries
+        self._transports = {}  # family -> [transport]
+        self._pending = {}  # (socket index, qid) -> (question, nameserver, future)
+        self._next = 0
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        families = {
+            socket.AF_INET6 if ipaddress.ip_address(host).version == 6 else socket.AF_INET
+            for host, _ in self.nameservers
+        }
+        index = 0
+        for family in families:
+            transports = self._transports[family] = []
+            for _ in range(self.socket_count):
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda i=index: _Protocol(self, i), family=family
+                )
+                transports.append((index, transport))
+                index += 1
+        return self
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def _on_reply(self, index, data, addr):
+        try:
+            qid, question, rcode, addresses, cnames, ttl = parse_response(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        entry = self._pending.get((index, qid))
+        if entry is None:
+            return
+        name, nameserver, future = entry
+        # ignore spoofed or stray packets that merely reuse an id
+        if addr[:2] != nameserver or question.lower() != name.lower() or future.done():
+            return
+        future.set_result(Answer(name, RCODES.get(rcode, str(rcode)), addresses, cnames, ttl))
+
+    async def _query(self, name, qtype, nameserver):
+        host, _ = nameserver
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        transports = self._transports[family]
+        index, transport = transports[self._next % len(transports)]
+        self._next += 1
+
+        qid = random.getrandbits(16)
+        while (index, qid) in self._pending:
+            qid = random.getrandbits(16)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(index, qid)] = (name.rstrip("."), nameserver, future)
+        try:
+            transport.sendto(build_query(qid, name, qtype), nameserver)
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            return Answer(name, "TIMEOUT", [], [], 0)
+        finally:
+            del self._pending[(index, qid)]
+
+    async def resolve(self, name, qtype="A"):
+        """Look name up, rotating nameservers on timeouts and server failures."""
+        qtype = QTYPES.get(qtype, qtype)
+        start = random.randrange(len(self.nameservers))
+        answer = None
+        for attempt in range(self.retries + 1):
+            nameserver = self.nameservers[(start + attempt) % len(self.nameservers)]
+            answer = await self._query(name, qtype, nameserver)
+            if answer.status not in RETRY_STATUSES:
+                break
+        return answer
+
+    def close(self):
+        for transports in self._transports.values():
+            for _, transport in transports:
+                transport.close()
+        self._transports = {}
+
+
+class CachingResolver:
+    """AsyncResolver front end with a bounded positive/negative answer cache.
+
+    Answers are kept for their own TTL (clamped to min_ttl..max_ttl);
+    NXDOMAIN and empty answers for negative_ttl. Timeouts are not
+    cached. Concurrent lookups of the same name share one query.
+    """
+
+    def __init__(self, resolver, max_entries=100_000, negative_ttl=300, min_ttl=30, max_ttl=3600):
+        self.resolver = resolver
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self._cache = OrderedDict()  # (name, qtype) -> (expires, Answer)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def open(self):
+        await self.resolver.open()
+        return self
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def _store(self, key, answer):
+        if answer.status == "NOERROR" and answer.addresses:
+            ttl = min(self.max_ttl, max(self.min_ttl, answer.ttl))
+        elif answer.status in ("NOERROR", "NXDOMAIN"):
+            ttl = self.negative_ttl
+        else:
+            return
+        self._cache[key] = (time.monotonic() + ttl, answer)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def resolve(self, name, qtype="A"):
+        key = (name.lower().rstrip("."), qtype)
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.hits += 1
+            return await asyncio.shield(task)
+        self.misses += 1
+        task = self._inflight[key] = asyncio.ensure_future(self.resolver.resolve(name, qtype))
+        try:
+            answer = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+        self._store(key, answer)
+        return answer
+
+    def close(self):
+        self.resolver.close()
@@ -0,0 +1,194 @@
+"""Pooled asyncio HTTP prober for subdomain_enumeration.py.
+
+Each probe asks for / over HTTPS and HTTP with HEAD, falling back to a
+GET only when HEAD is refused, and reads at most `max_body` bytes of
+any body. Redirects are recorded, not followed. Connections are kept
+alive and reused: plain HTTP connections per (address, port), since
+many subdomains share a front end, and TLS ones per (address, port,
+SNI name).
+"""
+import asyncio
+import ssl
+from collections import OrderedDict, namedtuple
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+USER_AGENT = "Mozilla/5.0 (compatible; subdomain-enum)"
+MAX_HEADER = 64 * 1024
+NO_BODY_STATUSES = {204, 304}
+
+# body is capped at max_body bytes; location is the raw Location header
+Response = namedtuple("Response", "scheme status location length body")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class _Connection:
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+
+class HTTPProber:
+    """HEAD-first HTTP(S) probes over a shared keep-alive connection pool."""
+
+    def __init__(self, timeout=5.0, max_body=64 * 1024, concurrency=50, max_idle=100, verify=False):
+        self.timeout = timeout
+        self.max_body = max_body
+        self.max_idle = max_idle
+        self._slots = asyncio.Semaphore(concurrency)
+        self._idle = OrderedDict()  # key -> [connection], least recently used first
+        self._idle_count = 0
+        self.connections_opened = 0
+        self.bytes_read = 0
+        self._ssl = ssl.create_default_context()
+        if not verify:
+            # we only want to know what answers, not whether its certificate is valid
+            self._ssl.check_hostname = False
+            self._ssl.verify_mode = ssl.CERT_NONE
+
+    def _checkout(self, key):
+        conns = self._idle.get(key)
+        if not conns:
+            return None
+        conn = conns.pop()
+        self._idle_count -= 1
+        if not conns:
+            del self._idle[key]
+        conn.reused = True
+        return conn
+
+    def _checkin(self, conn):
+        self._idle.setdefault(conn.key, []).append(conn)
+        self._idle.move_to_end(conn.key)
+        self._idle_count += 1
+        while self._idle_count > self.max_idle:
+            key, conns = next(iter(self._idle.items()))
+            conns.pop(0).close()
+            self._idle_count -= 1
+            if not conns:
+                del self._idle[key]
+
+    async def _connect(self, scheme, hostname, address, port):
+        key = (scheme, address or hostname, port, hostname if scheme == "https" else None)
+        conn = self._checkout(key)
+        if conn is not None:
+            return conn
+        reader, writer = await asyncio.open_connection(
+            address or hostname,
+            port,
+            ssl=self._ssl if scheme == "https" else None,
+            server_hostname=hostname if scheme == "https" else None,
+            limit=MAX_HEADER,
+        )
+        self.connections_opened += 1
+        return _Connection(key, reader, writer)
+
+    async def _read_body(self, reader, headers):
+        """Return (body, fully read) without reading more than max_body."""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")  # no trailers expected
+                    return bytes(body), True
+                if len(body) + size > self.max_body:
+                    body += await reader.readexactly(self.max_body - len(body))
+                    return bytes(body), False
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            body = await reader.readexactly(min(length, self.max_body))
+            return body, length <= self.max_body
+        # delimited by close: read up to the cap and give up the connection
+        return await reader.read(self.max_body), False
+
+    async def _exchange(self, conn, method, hostname):
+        request = (
+            f"{method} / HTTP/1.1\r\n"
+            f"Host: {hostname}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        conn.writer.write(request.encode("ascii"))
+        await conn.writer.drain()
+
+        head = await conn.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+            raise ProtocolError(lines[0][:80])
+        status = int(parts[1])
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in NO_BODY_STATUSES or status < 200:
+            body, complete = b"", True
+        else:
+            body, complete = await self._read_body(conn.reader, headers)
+        self.bytes_read += len(head) + len(body)
+
+        keep = complete and parts[0] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        length = int(headers["content-length"]) if headers.get("content-length", "").isdigit() else len(body)
+        return Response(None, status, headers.get("location"), length, body), keep
+
+    async def request(self, method, scheme, hostname, address=None, port=None):
+        """One request to / on a pooled connection; a stale reused one is retried fresh."""
+        port = port or DEFAULT_PORTS[scheme]
+        for _ in range(2):
+            conn = await self._connect(scheme, hostname, address, port)
+            try:
+                response, keep = await asyncio.wait_for(self._exchange(conn, method, hostname), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    asyncio.TimeoutError, ValueError, ProtocolError):
+                conn.close()
+                if conn.reused:
+                    continue  # the server closed an idle connection under us
+                raise
+            if keep:
+                self._checkin(conn)
+            else:
+                conn.close()
+            return response._replace(scheme=scheme)
+        raise ProtocolError("connection closed")
+
+    async def probe(self, hostname, addresses=None, schemes=("https", "http"), get=False):
+        """Responses from each scheme that answers; HEAD unless get or HEAD is refused."""
+        address = addresses[0] if addresses else None
+        results = []
+        async with self._slots:
+            for scheme in schemes:
+                try:
+                    response = None
+                    if not get:
+                        response = await asyncio.wait_for(
+                            self.request("HEAD", scheme, hostname, address), self.timeout * 2
+                        )
+                    if response is None or response.status in (405, 501):
+                        response = await asyncio.wait_for(
+                            self.request("GET", scheme, hostname, address), self.timeout * 2
+                        )
+                except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError, ValueError, ProtocolError):
+                    continue
+                results.append(response)
+        return results
+
+    def close(self):
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+        self._idle_count = 0
@@ -1,51 +1,363 @@
-import requests
-import threading
+import argparse
+import asyncio
+import json
+import os
+from collections import Counter, deque
+
+from dns_resolver import AsyncResolver, CachingResolver, parse_nameserver, system_nameservers
+from http_probe import HTTPProber
+from wildcard import WildcardFilter, body_fingerprint
+from wordlist import SeenFilter, permutations, read_wordlist
+
+HERE = os.path.dirname(os.path.abspath(__file__))
 
 domain = "youtube.com"
-subdomains_file = "Subdomain Enumeration Tool\subdomains.txt"
-output_file = "Subdomain Enumeration Tool\discovered_subdomains.txt"
+subdomains_file = os.path.join(HERE, "subdomains.txt")
+output_file = os.path.join(HERE, "discovered_subdomains.txt")
+
+def describe(responses):
+    """'https 200, http 301 -> https://...' for the found line."""
+    return ", ".join(
+        f"{r.scheme} {r.status}" + (f" -> {r.location}" if r.location else "") for r in responses
+    )
+
+async def check_subdomain(prober, subdomain, domain=domain, addresses=None, wildcard_bodies=()):
+    """Probe a subdomain over HTTPS and HTTP and return the responses.
+
+    Any HTTP response counts; a page matching one of wildcard_bodies for
+    its scheme (see WildcardFilter.wildcard_bodies) is the zone's
+    catch-all page and does not.
+    """
+    hostname = f"{subdomain}.{domain}"
+    # HEAD says nothing about the page, so wildcard zones need a (capped) GET
+    responses = await prober.probe(hostname, addresses, get=bool(wildcard_bodies))
+    if wildcard_bodies:
+        responses = [
+            r for r in responses
+            if (r.scheme,) + body_fingerprint(r.status, r.body, hostname) not in wildcard_bodies
+        ]
+    return responses
+
+class Results:
+    """Found names: printed, kept for the text output and streamed as JSON lines."""
+
+    def __init__(self, jsonl_path=None, qualify=False):
+        self.found = []
+        self.qualify = qualify
+        self._jsonl = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+
+    def name(self, domain, sub):
+        return f"{sub}.{domain}" if self.qualify else sub
+
+    def add(self, domain, sub, addresses, responses):
+        self.found.append((domain, sub))
+        detail = f"({describe(responses)})" if responses else f"-> {', '.join(addresses)}"
+        print(f"[+] Found: {self.name(domain, sub)} {detail}")
+        if self._jsonl is not None:
+            record = {
+                "domain": domain,
+                "subdomain": f"{sub}.{domain}",
+                "ips": list(addresses),
+                "status": responses[0].status if responses else None,
+                "http": [
+                    {"scheme": r.scheme, "status": r.status, "location": r.location}
+                    for r in responses
+                ],
+            }
+            self._jsonl.write(json.dumps(record) + "\n")
+            self._jsonl.flush()
+
+    def save(self, path):
+        with open(path, "w") as f:
+            for domain, sub in self.found:
+                print(self.name(domain, sub), file=f)
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+
+class Candidates:
+    """Wordlist entries and permutations of found names, each handed out once.
+
+    Permutations jump ahead of the wordlist. feed() ends only when the
+    wordlist is exhausted and no candidate in flight can add more.
+
+    Labels are deduplicated per domain pass with a filter of their own,
+    so a batch of domains needs no more room than a single wordlist; it
+    is dropped once its domain has nothing left in flight. Permutations
+    go into one shared filter keyed by full name.
+    """
+
+    def __init__(self, words, capacity=2_000_000, depth=1, numbers=3):
+        # words yields (label, domain) pairs, one domain after another
+        self.words = iter(words)
+        self.capacity = capacity
+        self.seen = SeenFilter(capacity)
+        self.labels = {}  # domain -> SeenFilter of its wordlist labels
+        self.reading = None  # domain whose wordlist pass is under way
+        self.inflight = Counter()
+        self.depth = depth
+        self.numbers = numbers
+        self.feedback = deque()
+        self.pending = 0
+        self.changed = asyncio.Event()
+        self.queued = 0
+        self.generated = 0
+
+    def _retire(self, domain):
+        if domain is not None and domain != self.reading and not self.inflight[domain]:
+            self.labels.pop(domain, None)
+            del self.inflight[domain]
+
+    def _next_word(self):
+        for word, domain in self.words:
+            if domain != self.reading:
+                previous, self.reading = self.reading, domain
+                self._retire(previous)
+                self.labels[domain] = SeenFilter(self.capacity)
+            # a permutation may have queued this name already
+            if self.labels[domain].add(word) and f"{word}.{domain}" not in self.seen:
+                return word, domain, 0
+        previous, self.reading = self.reading, None
+        self._retire(previous)
+        return None
+
+    def found(self, sub, domain, depth):
+        if depth >= self.depth:
+            return
+        labels = self.labels.get(domain)
+        for candidate in permutations(sub, self.numbers):
+            if labels is not None and candidate in labels:
+                continue  # already handed out from the wordlist
+            if self.seen.add(f"{candidate}.{domain}"):
+                self.feedback.append((candidate, domain, depth + 1))
+                self.generated += 1
 
-discovered_subdomains = []
-lock = threading.Lock()
+    def done(self, domain):
+        self.pending -= 1
+        self.inflight[domain] -= 1
+        self._retire(domain)
+        self.changed.set()
 
-def check_subdomain(subdomain):
-    """Check if a subdomain is active by making an HTTP request."""
-    url = f"http://{subdomain}.{domain}"
+    async def feed(self, queue, workers):
+        while True:
+            item = self.feedback.popleft() if self.feedback else self._next_word()
+            if item is None:
+                if not self.pending:
+                    break
+                # wait for in-flight candidates, which may still add permutations
+                self.changed.clear()
+                await self.changed.wait()
+                continue
+            self.pending += 1
+            self.inflight[item[1]] += 1
+            self.queued += 1
+            await queue.put(item)
+        for _ in range(workers):
+            await queue.put(None)
+
+async def check_candidate(sub, domain, resolver=None, prober=None, wildcard=None, fetch=None):
+    """(addresses, responses) if the candidate exists, else None.
+
+    With a resolver, candidates must resolve first and only those reach
+    the prober; without one every candidate goes straight to the prober.
+    """
+    if resolver is None:
+        responses = await check_subdomain(prober, sub, domain)
+        return ([], responses) if responses else None
+
+    name = f"{sub}.{domain}"
     try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            with lock:
-                discovered_subdomains.append(subdomain)
-                print(f"[+] Found: {subdomain}")
-    except requests.ConnectionError:
-        pass
-    except Exception as e:
-        print(f"[!] Error checking {subdomain}: {e}")
+        answer = await resolver.resolve(name)
+    except (UnicodeError, ValueError):
+        return None  # not a valid DNS name
+    if not answer.addresses:
+        return None
+    # drop wildcard answers here, before they cost an HTTP request
+    if wildcard is not None and await wildcard.is_wildcard(name, answer):
+        return None
+    if prober is None:
+        return answer.addresses, []
+    # only names that resolve are worth an HTTP request
+    bodies = set()
+    if wildcard is not None:
+        bodies = await wildcard.wildcard_bodies(name, fetch)
+    responses = await check_subdomain(prober, sub, domain, answer.addresses, bodies)
+    return (answer.addresses, responses) if responses else None
 
-def main():
-    
+async def enumerate_worker(queue, candidates, results, resolver=None, prober=None, wildcard=None):
+    """Check candidates from the queue until a None sentinel arrives."""
+    async def fetch(hostname, addresses):
+        responses = await prober.probe(hostname, addresses, get=True)
+        return [(r.scheme, r.status, r.body) for r in responses]
+
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        sub, domain, depth = item
+        try:
+            found = await check_candidate(sub, domain, resolver, prober, wildcard, fetch)
+            if found is not None:
+                results.add(domain, sub, *found)
+                candidates.found(sub, domain, depth)
+        finally:
+            candidates.done(domain)
+
+def iter_candidates(domains, wordlist):
+    """(label, domain) for every wordlist entry under every domain, read lazily."""
+    for name in domains:
+        for word in read_wordlist(wordlist):
+            yield word, name
+
+async def enumerate_subdomains(args, domains, results):
+    """Stream candidates for all domains through one worker pool and resolver."""
+    words = iter_candidates(domains, args.wordlist)
+    candidates = Candidates(words, args.dedup_capacity, args.perm_depth, args.perm_numbers)
+    prober = None
+    if args.mode == "http" or args.http:
+        prober = HTTPProber(args.http_timeout, args.max_body, args.http_workers)
+    resolver = None
+    if args.mode == "dns":
+        resolver = await CachingResolver(
+            AsyncResolver(args.nameservers, args.sockets, args.dns_timeout, args.dns_retries),
+            args.dns_cache_size,
+            args.negative_ttl,
+        ).open()
+    wildcard = WildcardFilter(resolver, args.wildcard_probes) if resolver and args.wildcard_check else None
+
+    concurrency = args.concurrency if resolver is not None else args.http_workers
+    queue = asyncio.Queue(maxsize=concurrency * 2)
     try:
-        with open(subdomains_file, "r") as f:
-            subdomains = f.read().splitlines()
-    except FileNotFoundError:
-        print(f"Error: {subdomains_file} not found.")
-        return
+        workers = [
+            asyncio.create_task(enumerate_worker(queue, candidates, results, resolver, prober, wildcard))
+            for _ in range(concurrency)
+        ]
+        await candidates.feed(queue, len(workers))
+        await asyncio.gather(*workers)
+    finally:
+        if resolver is not None:
+            resolver.close()
+        if prober is not None:
+            prober.close()
 
-    threads = []
-    for sub in subdomains:
-        t = threading.Thread(target=check_subdomain, args=(sub,))
-        t.start()
-        threads.append(t)
+    print(f"[*] Checked {candidates.queued} candidates ({candidates.generated} from permutations)")
+    if resolver is not None:
+        print(f"[*] DNS: {resolver.misses} queries, {resolver.hits} answered from cache")
+    if wildcard is not None and wildcard.filtered:
+        print(f"[*] Skipped {wildcard.filtered} candidates that only matched a wildcard record")
+    if prober is not None:
+        print(f"[*] HTTP: {prober.connections_opened} connections, {prober.bytes_read} bytes read")
 
-    for t in threads:
-        t.join()
+def read_domains(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip().lower().rstrip(".") for line in f
+            if line.strip() and not line.startswith("#")
+        ]
+
+def nameserver_list(text):
+    """argparse type for -n: resolved (address, port) pairs."""
+    try:
+        return [parse_nameserver(ns) for ns in text.split(",") if ns.strip()]
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Subdomain enumeration by DNS resolution and/or HTTP.")
+    parser.add_argument("-d", "--domain", default=domain, help=f"Domain to enumerate (default: {domain})")
+    parser.add_argument("-D", "--domains", help="File of domains to enumerate in one batch, one per line")
+    parser.add_argument("-w", "--wordlist", default=subdomains_file, help="Candidate labels, one per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default=output_file, help="File to write discovered subdomains to")
+    parser.add_argument("--jsonl", help="Also stream results as JSON lines (domain, subdomain, ips, http status)")
+    parser.add_argument(
+        "--mode",
+        choices=("dns", "http"),
+        default="dns",
+        help="dns: resolve candidates first (default); http: probe every candidate over HTTP(S)",
+    )
+    parser.add_argument("--http", action="store_true", help="In dns mode, also require an HTTP(S) response from resolved names")
+    parser.add_argument("--http-workers", type=int, default=50, help="Concurrent HTTP probes (default: 50)")
+    parser.add_argument("--http-timeout", type=float, default=5.0, help="Seconds per HTTP request (default: 5)")
+    parser.add_argument(
+        "--max-body",
+        type=int,
+        default=64 * 1024,
+        help="Most bytes read from any response body (default: 65536)",
+    )
+    parser.add_argument(
+        "-n", "--nameservers",
+        type=nameserver_list,
+        default=None,
+        help="Comma separated nameservers, host or host:port (default: from /etc/resolv.conf)",
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=500, help="DNS queries in flight (default: 500)")
+    parser.add_argument("--sockets", type=int, default=4, help="UDP sockets shared by all queries (default: 4)")
+    parser.add_argument("--dns-timeout", type=float, default=2.0, help="Seconds to wait for each DNS reply (default: 2)")
+    parser.add_argument("--dns-retries", type=int, default=2, help="Retries on timeout or server failure (default: 2)")
+    parser.add_argument("--dns-cache-size", type=int, default=100_000, help="Answers kept in the DNS cache (default: 100000)")
+    parser.add_argument(
+        "--negative-ttl",
+        type=int,
+        default=300,
+        help="Seconds to remember that a name does not exist (default: 300)",
+    )
+    parser.add_argument(
+        "--no-wildcard-check",
+        dest="wildcard_check",
+        action="store_false",
+        help="Keep candidates that only match a wildcard DNS record",
+    )
+    parser.add_argument(
+        "--wildcard-probes",
+        type=int,
+        default=3,
+        help="Random labels resolved to fingerprint a wildcard (default: 3)",
+    )
+    parser.add_argument(
+        "--perm-depth",
+        type=int,
+        default=1,
+        help="Rounds of permutations generated from found names, 0 to disable (default: 1)",
+    )
+    parser.add_argument("--perm-numbers", type=int, default=3, help="Numeric suffixes tried per found name (default: 3)")
+    parser.add_argument(
+        "--dedup-capacity",
+        type=int,
+        default=2_000_000,
+        help="Wordlist entries per domain the duplicate filters are sized for; memory stays fixed (default: 2000000)",
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.wordlist != "-" and not os.path.isfile(args.wordlist):
+        print(f"Error: {args.wordlist} not found.")
+        return
+    domains = [args.domain]
+    if args.domains:
+        try:
+            domains = read_domains(args.domains)
+        except FileNotFoundError:
+            print(f"Error: {args.domains} not found.")
+            return
+        if args.wordlist == "-" and len(domains) > 1:
+            print("Error: a wordlist on stdin can only be used with a single domain.")
+            return
+
+    if args.mode == "dns" and not args.nameservers:
+        args.nameservers = system_nameservers()
+    results = Results(args.jsonl, qualify=len(domains) > 1)
+    try:
+        asyncio.run(enumerate_subdomains(args, domains, results))
+    finally:
+        results.close()
 
-    with open(output_file, "w") as f:
-        for sub in discovered_subdomains:
-            print(sub, file=f)
+    results.save(args.output)
 
-    print(f"\n[+] Scan complete. Discovered {len(discovered_subdomains)} subdomains.")
-    print(f"[+] Results saved to {output_file}")
+    print(f"\n[+] Scan complete. Discovered {len(results.found)} subdomains.")
+    print(f"[+] Results saved to {args.output}")
 
 if __name__ == "__main__":
     main()
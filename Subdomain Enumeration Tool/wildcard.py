@@ -0,0 +1,112 @@
+"""Wildcard DNS detection for subdomain_enumeration.py.
+
+A zone is a wildcard if names nobody would register (random labels)
+resolve in it. Their answers become the zone's fingerprint and any
+candidate whose answer matches it is dropped before the HTTP stage. A
+wildcard behind a load balancer can hand out addresses the first
+probes never saw, so an unfamiliar answer is checked against a few
+more random labels before it counts as real. For the HTTP stage, the
+page served for a random label is fingerprinted as well.
+"""
+import asyncio
+import hashlib
+import random
+import string
+
+
+def random_label(length=16):
+    return "".join(random.choice(string.ascii_lowercase + string.digits) for _ in range(length))
+
+
+def body_fingerprint(status, body, hostname):
+    """Hash of a response with the requested hostname blanked out.
+
+    Wildcard pages often echo the name they were asked for, which would
+    otherwise make every one of them unique.
+    """
+    label = hostname.split(".", 1)[0].encode()
+    normalized = body.replace(hostname.encode(), b"").replace(label, b"")
+    return status, hashlib.sha1(normalized).hexdigest()
+
+
+class Zone:
+    def __init__(self, name, addresses, cnames):
+        self.name = name
+        self.wildcard = bool(addresses or cnames)
+        self.addresses = set(addresses)
+        self.cnames = set(cnames)
+        self.bodies = None  # task for the wildcard page fingerprints
+
+
+class WildcardFilter:
+    """Decide whether a resolved candidate is only a wildcard answer."""
+
+    def __init__(self, resolver, probes=3, reprobes=2):
+        self.resolver = resolver
+        self.probes = probes
+        self.reprobes = reprobes
+        self._zones = {}  # zone name -> task returning Zone
+        self.filtered = 0
+
+    async def _probe(self, zone):
+        return await self.resolver.resolve(f"{random_label()}.{zone}")
+
+    async def _detect(self, zone):
+        answers = await asyncio.gather(*(self._probe(zone) for _ in range(self.probes)))
+        addresses = [ip for answer in answers for ip in answer.addresses]
+        cnames = [cname for answer in answers for cname in answer.cnames]
+        info = Zone(zone, addresses, cnames)
+        if info.wildcard:
+            print(f"[*] Wildcard DNS on {zone}: {', '.join(sorted(info.addresses | info.cnames))}")
+        return info
+
+    def zone(self, zone):
+        """Task resolving to the Zone of `zone`; detection runs once per zone."""
+        task = self._zones.get(zone)
+        if task is None:
+            task = self._zones[zone] = asyncio.ensure_future(self._detect(zone))
+        return task
+
+    def _matches(self, info, answer):
+        if answer.cnames and info.cnames.intersection(answer.cnames):
+            return True
+        return bool(answer.addresses) and info.addresses.issuperset(answer.addresses)
+
+    async def is_wildcard(self, name, answer):
+        """True if the answer for name is what its zone's wildcard returns."""
+        info = await self.zone(name.split(".", 1)[1])
+        if not info.wildcard:
+            return False
+        for attempt in range(self.reprobes + 1):
+            if self._matches(info, answer):
+                self.filtered += 1
+                return True
+            if attempt < self.reprobes:
+                probe = await self._probe(info.name)
+                info.addresses.update(probe.addresses)
+                info.cnames.update(probe.cnames)
+        return False
+
+    async def wildcard_bodies(self, name, fetch):
+        """Fingerprints of the pages a wildcard zone serves for random names.
+
+        Empty unless the zone of name is a wildcard. Each fingerprint is
+        (scheme, status, body hash), so a candidate's responses are
+        compared with the wildcard page of the same scheme. fetch(hostname,
+        addresses) -> [(scheme, status, body)] is a coroutine function and
+        is given the wildcard's own addresses.
+        """
+        info = await self.zone(name.split(".", 1)[1])
+        if not info.wildcard:
+            return set()
+        if info.bodies is None:
+            info.bodies = asyncio.ensure_future(self._fetch_bodies(info, fetch))
+        return await info.bodies
+
+    async def _fetch_bodies(self, info, fetch):
+        fingerprints = set()
+        for _ in range(2):
+            hostname = f"{random_label()}.{info.name}"
+            for scheme, status, body in await fetch(hostname, sorted(info.addresses)):
+                fingerprints.add((scheme,) + body_fingerprint(status, body, hostname))
+        return fingerprints
@@ -0,0 +1,91 @@
+"""Streaming candidate sources for subdomain_enumeration.py.
+
+Wordlists are read one line at a time and deduplicated with a
+fixed-size Bloom filter, so memory does not grow with the list. Names
+that turn out to exist are mutated into new candidates (numeric
+suffixes, dash/dot variants, environment prefixes and suffixes).
+"""
+import hashlib
+import math
+import re
+import sys
+
+ENV_WORDS = ("dev", "test", "stage", "staging", "prod", "qa", "uat", "beta", "old", "new")
+LABEL = re.compile(r"^[a-z0-9_]([a-z0-9_.-]*[a-z0-9_])?$")
+
+
+class SeenFilter:
+    """Bloom filter of candidate names with a fixed memory footprint.
+
+    Sized for `capacity` names at `error_rate` false positives; a false
+    positive only means a candidate is skipped as a duplicate.
+    """
+
+    def __init__(self, capacity=2_000_000, error_rate=1e-4):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, name):
+        digest = hashlib.blake2b(name.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, name):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(name))
+
+    def add(self, name):
+        """Add name; return False if it was (probably) seen before."""
+        new = False
+        for pos in self._positions(name):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        return new
+
+
+def read_wordlist(path):
+    """Yield normalised candidate labels from path ('-' for stdin) lazily."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", errors="replace")
+    try:
+        for line in f:
+            label = line.strip().lower().rstrip(".")
+            if label and not label.startswith("#") and LABEL.match(label):
+                yield label
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def permutations(label, numbers=3, words=ENV_WORDS):
+    """Yield likely siblings of a label that exists."""
+    parts = [p for p in re.split(r"[-.]", label) if p]
+
+    # api-dev <-> api.dev <-> apidev, and each piece on its own
+    if len(parts) > 1:
+        yield "-".join(parts)
+        yield ".".join(parts)
+        yield "".join(parts)
+        yield from parts
+
+    # numeric suffixes: api -> api1, api-1; api2 -> api1, api3
+    match = re.match(r"^(.*?)(\d+)$", label)
+    if match:
+        stem, digits = match.groups()
+        value = int(digits)
+        for n in range(max(0, value - numbers), value + numbers + 1):
+            if n != value:
+                yield f"{stem}{n:0{len(digits)}d}"
+    else:
+        for n in range(1, numbers + 1):
+            yield f"{label}{n}"
+            yield f"{label}-{n}"
+
+    for word in words:
+        if word in parts:
+            continue
+        yield f"{label}-{word}"
+        yield f"{word}-{label}"
+        yield f"{word}.{label}"